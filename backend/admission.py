@@ -0,0 +1,281 @@
+import asyncio
+import hmac
+import math
+import os
+import time
+from collections import OrderedDict, deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+from fastapi import HTTPException, Request
+
+T = TypeVar("T")
+
+# Lanes in priority order: waiting interactive work always starts before bulk work
+LANES = ("interactive", "bulk")
+
+# Reverse proxies in front of the app; each appends the address it received the
+# request from to X-Forwarded-For, so only that many right-most entries are trusted
+TRUSTED_PROXY_HOPS = int(os.environ.get("TRUSTED_PROXY_HOPS", "0"))
+
+
+def _parse_client_keys(value: str) -> Dict[str, str]:
+    """Parse ``client-id:secret`` pairs separated by commas"""
+    keys = {}
+    for pair in value.split(","):
+        client_id, _, secret = pair.strip().partition(":")
+        if client_id and secret:
+            keys[client_id] = secret
+    return keys
+
+
+# X-Client-Id is only honoured together with its matching X-Client-Key
+CLIENT_KEYS = _parse_client_keys(os.environ.get("ADMISSION_CLIENT_KEYS", ""))
+
+
+class AdmissionRejected(HTTPException):
+    """429 with a Retry-After hint, raised when a request is over quota"""
+
+    def __init__(self, reason: str, retry_after: float):
+        self.retry_after = max(1, math.ceil(retry_after))
+        super().__init__(
+            status_code=429,
+            detail=f"Too many requests: {reason}. Retry in {self.retry_after}s.",
+            headers={"Retry-After": str(self.retry_after)}
+        )
+
+
+class TokenBucket:
+    """Allows ``rate`` operations per second with bursts of up to ``capacity``"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self) -> float:
+        """Seconds until a token is available, 0 if one is available now"""
+        self._refill()
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        self._refill()
+        self.tokens -= 1
+
+    @property
+    def full(self) -> bool:
+        self._refill()
+        return self.tokens >= self.capacity
+
+
+class AdmissionTicket:
+    """An admitted unit of work; must be released exactly once when the work ends"""
+
+    def __init__(self, controller: "AdmissionController", client_id: str, lane: str):
+        self.controller = controller
+        self.client_id = client_id
+        self.lane = lane
+        self.started_at: Optional[float] = None
+        self.released = False
+
+    def release(self) -> None:
+        if not self.released:
+            self.released = True
+            self.controller._release(self)
+
+
+class AdmissionController:
+    """Per-client and global quotas in front of expensive parse, LLM and render work
+
+    Admission is decided up front, so a rejected request costs nothing; admitted
+    work then waits for one of ``global_concurrency`` execution slots, with
+    interactive work served ahead of bulk work.
+    """
+
+    def __init__(self, global_concurrency: int = 8, global_rate_per_minute: float = 300,
+                 client_concurrency: int = 2, client_rate_per_minute: float = 10,
+                 client_burst: int = 5, max_queued: Optional[Dict[str, int]] = None,
+                 max_tracked_clients: int = 10000):
+        self.global_concurrency = global_concurrency
+        self.client_concurrency = client_concurrency
+        self.client_rate = client_rate_per_minute / 60
+        self.client_burst = client_burst
+        self.max_queued = max_queued or {"interactive": 32, "bulk": 64}
+        self.max_tracked_clients = max_tracked_clients
+
+        self._global_bucket = TokenBucket(global_rate_per_minute / 60, max(global_rate_per_minute / 6, 1))
+        self._client_buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._client_inflight: Dict[str, int] = {}
+        self._queued: Dict[str, int] = {lane: 0 for lane in LANES}
+        self._waiters: Dict[str, Deque[asyncio.Future]] = {lane: deque() for lane in LANES}
+        self._running = 0
+        # Moving average of slot hold time, used to estimate Retry-After
+        self._avg_job_seconds = 30.0
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        return cls(
+            global_concurrency=int(os.environ.get("ADMISSION_GLOBAL_CONCURRENCY", "8")),
+            global_rate_per_minute=float(os.environ.get("ADMISSION_GLOBAL_RATE_PER_MINUTE", "300")),
+            client_concurrency=int(os.environ.get("ADMISSION_CLIENT_CONCURRENCY", "2")),
+            client_rate_per_minute=float(os.environ.get("ADMISSION_CLIENT_RATE_PER_MINUTE", "10")),
+            client_burst=int(os.environ.get("ADMISSION_CLIENT_BURST", "5")),
+            max_queued={
+                "interactive": int(os.environ.get("ADMISSION_MAX_QUEUED_INTERACTIVE", "32")),
+                "bulk": int(os.environ.get("ADMISSION_MAX_QUEUED_BULK", "64")),
+            },
+        )
+
+    def _client_bucket(self, client_id: str) -> TokenBucket:
+        bucket = self._client_buckets.get(client_id)
+        if bucket is None:
+            bucket = TokenBucket(self.client_rate, self.client_burst)
+            self._client_buckets[client_id] = bucket
+            # Forget the least recently seen clients whose buckets have refilled
+            while len(self._client_buckets) > self.max_tracked_clients:
+                oldest_id, oldest = next(iter(self._client_buckets.items()))
+                if not oldest.full and oldest_id != client_id:
+                    break
+                self._client_buckets.popitem(last=False)
+        self._client_buckets.move_to_end(client_id)
+        return bucket
+
+    def _queue_wait_estimate(self, lane: str) -> float:
+        ahead = self._queued["interactive"] + (self._queued["bulk"] if lane == "bulk" else 0)
+        return self._avg_job_seconds * (ahead + 1) / self.global_concurrency
+
+    def admit(self, client_id: str, lane: str = "interactive", enforce_quotas: bool = True) -> AdmissionTicket:
+        """Admit work for a client or raise AdmissionRejected
+
+        Internal work such as resuming interrupted jobs passes ``enforce_quotas=False``;
+        it still queues for an execution slot like any other work.
+        """
+        if lane not in LANES:
+            raise ValueError(f"Unknown lane '{lane}'")
+
+        if enforce_quotas:
+            self._check_quotas(client_id, lane)
+
+        self._client_inflight[client_id] = self._client_inflight.get(client_id, 0) + 1
+        self._queued[lane] += 1
+        return AdmissionTicket(self, client_id, lane)
+
+    def _check_quotas(self, client_id: str, lane: str) -> None:
+        if self._client_inflight.get(client_id, 0) >= self.client_concurrency:
+            raise AdmissionRejected("too many concurrent requests for this client", self._avg_job_seconds)
+        if self._queued[lane] >= self.max_queued[lane]:
+            raise AdmissionRejected(f"{lane} queue is full", self._queue_wait_estimate(lane))
+
+        client_bucket = self._client_bucket(client_id)
+        client_wait = client_bucket.wait_time()
+        if client_wait:
+            raise AdmissionRejected("rate limit exceeded for this client", client_wait)
+        global_wait = self._global_bucket.wait_time()
+        if global_wait:
+            raise AdmissionRejected("service is at capacity", global_wait)
+        client_bucket.take()
+        self._global_bucket.take()
+
+    def lane_for(self, client_id: str, requested: Optional[str] = None) -> str:
+        """Bulk if asked for, or if the client already has work in flight"""
+        if requested == "bulk" or self._client_inflight.get(client_id, 0) > 0:
+            return "bulk"
+        return "interactive"
+
+    async def acquire_slot(self, ticket: AdmissionTicket) -> None:
+        """Wait for an execution slot; the slot is returned when the ticket is released"""
+        higher_waiting = any(self._waiters[lane] for lane in LANES[:LANES.index(ticket.lane) + 1])
+        if self._running >= self.global_concurrency or higher_waiting:
+            future = asyncio.get_running_loop().create_future()
+            self._waiters[ticket.lane].append(future)
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future in self._waiters[ticket.lane]:
+                    self._waiters[ticket.lane].remove(future)
+                elif future.done() and not future.cancelled():
+                    # The slot was handed over just as we were cancelled
+                    self._running -= 1
+                    self._wake_next()
+                raise
+        else:
+            self._running += 1
+        self._queued[ticket.lane] -= 1
+        ticket.started_at = time.monotonic()
+
+    def _wake_next(self) -> None:
+        for lane in LANES:
+            waiters = self._waiters[lane]
+            while waiters:
+                future = waiters.popleft()
+                if not future.done():
+                    # The slot passes straight to the waiter
+                    self._running += 1
+                    future.set_result(None)
+                    return
+
+    def _release(self, ticket: AdmissionTicket) -> None:
+        if ticket.started_at is not None:
+            elapsed = time.monotonic() - ticket.started_at
+            self._avg_job_seconds = 0.8 * self._avg_job_seconds + 0.2 * elapsed
+            self._running -= 1
+            self._wake_next()
+        else:
+            self._queued[ticket.lane] -= 1
+
+        remaining = self._client_inflight.get(ticket.client_id, 1) - 1
+        if remaining > 0:
+            self._client_inflight[ticket.client_id] = remaining
+        else:
+            self._client_inflight.pop(ticket.client_id, None)
+
+    async def run(self, ticket: AdmissionTicket, fn: Callable[..., Awaitable[T]], *args, **kwargs) -> T:
+        """Run admitted work once an execution slot is free, releasing the ticket afterwards"""
+        try:
+            await self.acquire_slot(ticket)
+            return await fn(*args, **kwargs)
+        finally:
+            ticket.release()
+
+    def snapshot(self) -> Dict:
+        return {
+            "running": self._running,
+            "global_concurrency": self.global_concurrency,
+            "queued": dict(self._queued),
+            "clients_in_flight": len(self._client_inflight),
+            "avg_job_seconds": round(self._avg_job_seconds, 2),
+        }
+
+
+def client_identity(request: Request, trusted_proxy_hops: int = TRUSTED_PROXY_HOPS,
+                    client_keys: Optional[Dict[str, str]] = None) -> str:
+    """Quota key for a request, built only from values the client cannot forge
+
+    An authenticated X-Client-Id wins; otherwise the key is the peer address or,
+    behind trusted proxies, the X-Forwarded-For entry the outermost one appended.
+    """
+    client_keys = CLIENT_KEYS if client_keys is None else client_keys
+    client_id = request.headers.get("x-client-id")
+    if client_id in client_keys:
+        client_key = request.headers.get("x-client-key") or ""
+        if hmac.compare_digest(client_key.encode("utf-8"), client_keys[client_id].encode("utf-8")):
+            return f"id:{client_id}"
+
+    address = request.client.host if request.client else "unknown"
+    if trusted_proxy_hops > 0:
+        hops = [
+            hop.strip()
+            for header in request.headers.getlist("x-forwarded-for")
+            for hop in header.split(",") if hop.strip()
+        ]
+        if hops:
+            address = hops[-min(trusted_proxy_hops, len(hops))]
+    return f"ip:{address}"
+
+
+admission_controller = AdmissionController.from_env()
@@ -0,0 +1,175 @@
+import asyncio
+import io
+import multiprocessing
+import os
+import re
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, Deque, Dict, List, Optional, Sequence, Tuple
+
+BULK_EXPORT_WORKERS = int(os.environ.get("BULK_EXPORT_WORKERS", str(os.cpu_count() or 1)))
+EXPORT_FORMATS = ("pdf", "docx")
+
+_UNSAFE_FILENAME_RE = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+def resume_data_to_content(resume_data: Dict) -> Dict:
+    """Convert editor resume data to the format expected by DocumentGenerator"""
+    personal_info = resume_data.get("personalInfo", {})
+    return {
+        "personal_info": {
+            "name": personal_info.get("fullName", ""),
+            "email": personal_info.get("email", ""),
+            "phone": personal_info.get("phone", ""),
+            "location": personal_info.get("location", ""),
+            "linkedin": personal_info.get("linkedin", ""),
+            "website": personal_info.get("website", "")
+        },
+        "summary": resume_data.get("summary", ""),
+        "experience": [
+            {
+                "company": exp.get("company", ""),
+                "position": exp.get("position", ""),
+                "location": exp.get("location", ""),
+                "start_date": exp.get("startDate", ""),
+                "end_date": exp.get("endDate", ""),
+                "achievements": exp.get("description", []) if isinstance(exp.get("description"), list) else exp.get("description", "").split('\n') if exp.get("description") else []
+            }
+            for exp in resume_data.get("experience", [])
+        ],
+        "education": [
+            {
+                "institution": edu.get("institution", ""),
+                "degree": edu.get("degree", ""),
+                "location": edu.get("location", ""),
+                "graduation": f"{edu.get('startDate', '')} - {edu.get('endDate', '')}" if edu.get('startDate') and edu.get('endDate') else "",
+                "gpa": edu.get("gpa", "")
+            }
+            for edu in resume_data.get("education", [])
+        ],
+        "skills": {
+            "technical": resume_data.get("skills", {}).get("technical", []),
+            "soft": resume_data.get("skills", {}).get("soft", [])
+        },
+        "certifications": resume_data.get("certifications", [])
+    }
+
+
+def render_documents(content: Dict, formats: Sequence[str]) -> Dict[str, bytes]:
+    """Render one resume in every requested format; runs in a worker process"""
+    from optimization_service import DocumentGenerator
+
+    rendered = {}
+    for file_format in formats:
+        output = io.BytesIO()
+        if file_format == "pdf":
+            DocumentGenerator.generate_pdf(content, output)
+        else:
+            DocumentGenerator.generate_docx(content, output)
+        rendered[file_format] = output.getvalue()
+    return rendered
+
+
+def export_filename(index: int, content: Optional[Dict], fallback: str) -> str:
+    name = ((content or {}).get("personal_info") or {}).get("name") or fallback
+    slug = _UNSAFE_FILENAME_RE.sub("_", name).strip("._")[:60] or "resume"
+    return f"{index + 1:04d}_{slug}"
+
+
+class _ZipStreamBuffer(io.RawIOBase):
+    """Write-only sink that lets ZipFile output be drained chunk by chunk"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class BulkExporter:
+    """Renders many resumes in a bounded process pool and streams them as a ZIP"""
+
+    def __init__(self, max_workers: int = BULK_EXPORT_WORKERS):
+        self.max_workers = max_workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Forking a process that runs the event loop and driver threads can
+            # deadlock the child on a lock one of those threads held
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    async def stream_zip(
+        self,
+        items: AsyncIterator[Tuple[str, Optional[Dict], Optional[str]]],
+        formats: Sequence[str]
+    ) -> AsyncIterator[bytes]:
+        """Yield ZIP bytes as documents finish rendering
+
+        ``items`` yields ``(base_name, content, error)``; items with an error get an
+        ``.error.txt`` entry instead of documents. At most two renders per worker
+        are in flight, so memory stays flat however many resumes are exported.
+        """
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        buffer = _ZipStreamBuffer()
+        pending: Deque[Tuple[str, asyncio.Future]] = deque()
+
+        # PDF and DOCX are already compressed; deflating them again only costs CPU
+        with zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_STORED) as archive:
+
+            def write_entry(base_name: str, rendered: Dict[str, bytes]) -> None:
+                for file_format, data in rendered.items():
+                    archive.writestr(f"{base_name}.{file_format}", data)
+
+            async def finish_oldest() -> bytes:
+                base_name, future = pending.popleft()
+                try:
+                    write_entry(base_name, await future)
+                except Exception as e:
+                    archive.writestr(f"{base_name}.error.txt", f"Rendering failed: {str(e)}")
+                return buffer.drain()
+
+            async for base_name, content, error in items:
+                if error:
+                    archive.writestr(f"{base_name}.error.txt", error)
+                else:
+                    pending.append((base_name, loop.run_in_executor(pool, render_documents, content, formats)))
+                while len(pending) >= self.max_workers * 2:
+                    yield await finish_oldest()
+                chunk = buffer.drain()
+                if chunk:
+                    yield chunk
+
+            while pending:
+                yield await finish_oldest()
+
+        # Closing the archive writes the central directory
+        yield buffer.drain()
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+bulk_exporter = BulkExporter()
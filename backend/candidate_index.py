@@ -0,0 +1,371 @@
+import asyncio
+import json
+import logging
+import math
+import os
+from collections import Counter
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from job_description_cache import (
+    PHRASE_SKILLS, STOPWORDS, TECH_SKILLS, extract_required_skills, normalize_job_description,
+    strip_boilerplate, tokenize
+)
+
+CANDIDATE_INDEX_DIR = os.environ.get("CANDIDATE_INDEX_DIR", "/app/backend/candidate_index")
+# Newly indexed resumes are merged into the on-disk segment in batches of this size
+MERGE_THRESHOLD = int(os.environ.get("CANDIDATE_INDEX_MERGE_THRESHOLD", "1000"))
+# Skills are what recruiters search for, so they count more than a mention in running text
+SKILL_TERM_WEIGHT = 3
+REQUIRED_SKILL_QUERY_WEIGHT = 2.0
+
+_ARRAY_FILES = ("indptr", "postings_docs", "postings_tfs", "doc_lengths")
+
+logger = logging.getLogger(__name__)
+
+
+def index_terms(text: str) -> Counter:
+    """Informative terms and known skill phrases with their counts"""
+    counts = Counter(
+        token for token in tokenize(text)
+        if token not in STOPWORDS and (len(token) > 2 or token in TECH_SKILLS)
+    )
+    lowered = text.lower()
+    for phrase in PHRASE_SKILLS:
+        occurrences = lowered.count(phrase)
+        if occurrences:
+            counts[phrase] += occurrences
+    return counts
+
+
+def resume_terms(extracted_text: str, skills: Iterable[str]) -> Counter:
+    counts = index_terms(extracted_text)
+    for skill in skills:
+        for term, count in index_terms(skill).items():
+            counts[term] += count * SKILL_TERM_WEIGHT
+    return counts
+
+
+def job_description_terms(job_description: str) -> Dict[str, float]:
+    """Query term weights for a job description, favouring required skills"""
+    relevant = strip_boilerplate(normalize_job_description(job_description))
+    weights = {term: 1 + math.log(count) for term, count in index_terms(relevant).items()}
+    for skill in extract_required_skills(relevant):
+        weights[skill] = weights.get(skill, 1.0) * REQUIRED_SKILL_QUERY_WEIGHT
+    return weights
+
+
+def _save_array(directory: str, name: str, array) -> None:
+    import numpy as np
+
+    # Write then rename so readers never see a half-written file
+    temporary_path = os.path.join(directory, f"{name}.tmp")
+    with open(temporary_path, "wb") as file:
+        np.save(file, array)
+    os.replace(temporary_path, os.path.join(directory, f"{name}.npy"))
+
+
+class CandidateIndex:
+    """BM25 inverted index over parsed resumes for ranking them against a job description
+
+    Postings live in CSR arrays (``indptr`` per term into ``postings_docs`` and
+    ``postings_tfs``) that are persisted with ``np.save`` and loaded memory-mapped.
+    Resumes added since the last merge are kept in a small in-memory segment and
+    merged in the background once MERGE_THRESHOLD of them have accumulated.
+    Scoring gathers the postings of every query term and sums them per document
+    with ``np.bincount``, so a query costs a few array operations however many
+    resumes are indexed. numpy is imported on first use, so importing the
+    app does not load it.
+    """
+
+    def __init__(self, directory: Optional[str] = CANDIDATE_INDEX_DIR, k1: float = 1.2, b: float = 0.75,
+                 merge_threshold: int = MERGE_THRESHOLD):
+        self.directory = directory
+        self.k1 = k1
+        self.b = b
+        self.merge_threshold = merge_threshold
+        self._reset()
+
+    def _reset(self) -> None:
+        self._terms: List[str] = []
+        self._vocab: Dict[str, int] = {}
+        # An empty segment is plain lists; loads and merges replace them with arrays
+        self._indptr = [0]
+        self._docs = []
+        self._tfs = []
+        self._base_lengths = []
+        # Document slots are never reused, so doc ids stay valid across merges
+        self._session_ids: List[Optional[str]] = []
+        self._doc_of: Dict[str, int] = {}
+        self._removed: set = set()
+        self._delta_docs: List[Tuple[int, Dict[str, int]]] = []
+        self._delta_postings: Dict[str, Tuple[List[int], List[int]]] = {}
+        self._delta_lengths: List[float] = []
+        self._lengths = None
+        self._merging = False
+        self.indexed_until: Optional[datetime] = None
+
+    def __len__(self) -> int:
+        return len(self._doc_of)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._doc_of
+
+    @property
+    def pending(self) -> int:
+        """Resumes indexed in memory but not yet merged to disk"""
+        return len(self._delta_docs)
+
+    def load(self) -> None:
+        """Load the persisted index memory-mapped; a missing or inconsistent index starts empty"""
+        self._reset()
+        if not self.directory:
+            return
+        manifest_path = os.path.join(self.directory, "manifest.json")
+        if not os.path.exists(manifest_path):
+            return
+        import numpy as np
+
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as file:
+                manifest = json.load(file)
+            arrays = {
+                name: np.load(os.path.join(self.directory, f"{name}.npy"), mmap_mode="r")
+                for name in _ARRAY_FILES
+            }
+            if (len(arrays["indptr"]) != len(manifest["terms"]) + 1
+                    or len(arrays["doc_lengths"]) != len(manifest["session_ids"])
+                    or len(arrays["postings_docs"]) != arrays["indptr"][-1]):
+                raise ValueError("index files do not match the manifest")
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable candidate index: {str(e)}")
+            return
+
+        self._terms = manifest["terms"]
+        self._vocab = {term: term_id for term_id, term in enumerate(self._terms)}
+        self._indptr = arrays["indptr"]
+        self._docs = arrays["postings_docs"]
+        self._tfs = arrays["postings_tfs"]
+        self._base_lengths = arrays["doc_lengths"]
+        self._session_ids = manifest["session_ids"]
+        self._doc_of = {
+            session_id: doc_id for doc_id, session_id in enumerate(self._session_ids) if session_id
+        }
+        if manifest.get("indexed_until"):
+            self.indexed_until = datetime.fromisoformat(manifest["indexed_until"])
+
+    def add(self, session_id: str, extracted_text: str, skills: Iterable[str],
+            updated_at: Optional[datetime] = None) -> None:
+        """Index a resume, replacing any earlier version of the same session"""
+        self.remove(session_id)
+        counts = resume_terms(extracted_text, skills)
+        doc_id = len(self._session_ids)
+        self._session_ids.append(session_id)
+        self._doc_of[session_id] = doc_id
+        self._delta_docs.append((doc_id, dict(counts)))
+        self._delta_lengths.append(float(sum(counts.values())))
+        for term, tf in counts.items():
+            docs, tfs = self._delta_postings.setdefault(term, ([], []))
+            docs.append(doc_id)
+            tfs.append(tf)
+        self._lengths = None
+        if updated_at and (self.indexed_until is None or updated_at > self.indexed_until):
+            self.indexed_until = updated_at
+
+    def remove(self, session_id: str) -> None:
+        doc_id = self._doc_of.pop(session_id, None)
+        if doc_id is not None:
+            self._session_ids[doc_id] = None
+            self._removed.add(doc_id)
+
+    def _doc_lengths(self):
+        import numpy as np
+
+        if self._lengths is None:
+            self._lengths = np.concatenate([
+                np.asarray(self._base_lengths, dtype=np.float32),
+                np.asarray(self._delta_lengths, dtype=np.float32)
+            ])
+        return self._lengths
+
+    def _postings(self, term: str) -> Tuple[List, List]:
+        import numpy as np
+
+        docs, tfs = [], []
+        term_id = self._vocab.get(term)
+        if term_id is not None:
+            start, end = self._indptr[term_id], self._indptr[term_id + 1]
+            docs.append(self._docs[start:end])
+            tfs.append(self._tfs[start:end])
+        delta = self._delta_postings.get(term)
+        if delta:
+            docs.append(np.asarray(delta[0], dtype=np.int32))
+            tfs.append(np.asarray(delta[1], dtype=np.float32))
+        return docs, tfs
+
+    def search(self, query_weights: Dict[str, float], k: int = 10) -> List[Tuple[str, float]]:
+        """Top ``k`` ``(session_id, score)`` pairs by BM25 score, best first"""
+        import numpy as np
+
+        lengths = self._doc_lengths()
+        doc_count = len(lengths)
+        live_count = len(self._doc_of)
+        if not live_count or not query_weights:
+            return []
+
+        doc_parts, tf_parts, weight_parts = [], [], []
+        for term, query_weight in query_weights.items():
+            docs, tfs = self._postings(term)
+            document_frequency = sum(len(part) for part in docs)
+            if not document_frequency:
+                continue
+            idf = math.log(1 + (live_count - document_frequency + 0.5) / (document_frequency + 0.5))
+            doc_parts.extend(docs)
+            tf_parts.extend(tfs)
+            weight_parts.append(np.full(document_frequency, idf * query_weight, dtype=np.float32))
+        if not doc_parts:
+            return []
+
+        docs = np.concatenate(doc_parts)
+        tfs = np.concatenate(tf_parts)
+        average_length = float(lengths.sum()) / live_count
+        norms = self.k1 * (1 - self.b + self.b * lengths[docs] / average_length)
+        contributions = np.concatenate(weight_parts) * tfs * (self.k1 + 1) / (tfs + norms)
+        scores = np.bincount(docs, weights=contributions, minlength=doc_count)
+        if self._removed:
+            scores[np.fromiter(self._removed, dtype=np.int64)] = 0
+
+        k = min(k, int(np.count_nonzero(scores)))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self._session_ids[doc_id], float(scores[doc_id])) for doc_id in top]
+
+    def _build_segment(self, delta_docs: List[Tuple[int, Dict[str, int]]], removed: set,
+                       session_ids: List[Optional[str]], indexed_until: Optional[datetime]) -> Dict:
+        """Merge pending resumes into new CSR arrays and persist them; runs off the event loop"""
+        import numpy as np
+
+        vocab = dict(self._vocab)
+        terms = list(self._terms)
+        new_term_ids, new_docs, new_tfs = [], [], []
+        for doc_id, counts in delta_docs:
+            for term, tf in counts.items():
+                term_id = vocab.get(term)
+                if term_id is None:
+                    term_id = vocab[term] = len(terms)
+                    terms.append(term)
+                new_term_ids.append(term_id)
+                new_docs.append(doc_id)
+                new_tfs.append(tf)
+
+        base_term_ids = np.repeat(np.arange(len(self._indptr) - 1, dtype=np.int32), np.diff(self._indptr))
+        term_ids = np.concatenate([base_term_ids, np.asarray(new_term_ids, dtype=np.int32)])
+        docs = np.concatenate([np.asarray(self._docs, dtype=np.int32), np.asarray(new_docs, dtype=np.int32)])
+        tfs = np.concatenate([np.asarray(self._tfs, dtype=np.float32), np.asarray(new_tfs, dtype=np.float32)])
+        lengths = np.concatenate([
+            np.asarray(self._base_lengths, dtype=np.float32),
+            np.asarray([sum(counts.values()) for _, counts in delta_docs], dtype=np.float32)
+        ])
+
+        if removed:
+            removed_ids = np.fromiter(removed, dtype=np.int64)
+            keep = ~np.isin(docs, removed_ids)
+            term_ids, docs, tfs = term_ids[keep], docs[keep], tfs[keep]
+            lengths[removed_ids[removed_ids < len(lengths)]] = 0
+
+        order = np.lexsort((docs, term_ids))
+        arrays = {
+            "indptr": np.concatenate([[0], np.cumsum(np.bincount(term_ids, minlength=len(terms)))]).astype(np.int64),
+            "postings_docs": docs[order],
+            "postings_tfs": tfs[order],
+            "doc_lengths": lengths,
+        }
+
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            for name in _ARRAY_FILES:
+                _save_array(self.directory, name, arrays[name])
+            # The manifest is written last; load() rejects arrays it does not match
+            manifest_path = os.path.join(self.directory, "manifest.json")
+            with open(manifest_path + ".tmp", "w", encoding="utf-8") as file:
+                json.dump({
+                    "terms": terms,
+                    "session_ids": session_ids,
+                    "indexed_until": indexed_until.isoformat() if indexed_until else None
+                }, file)
+            os.replace(manifest_path + ".tmp", manifest_path)
+            arrays = {
+                name: np.load(os.path.join(self.directory, f"{name}.npy"), mmap_mode="r")
+                for name in _ARRAY_FILES
+            }
+        return {"terms": terms, "vocab": vocab, **arrays}
+
+    def _start_merge(self) -> Optional[Tuple[tuple, Callable[[Dict], None]]]:
+        if self._merging or not (self._delta_docs or self._removed):
+            return None
+        self._merging = True
+        merged_count = len(self._delta_docs)
+        removed = set(self._removed)
+        args = (
+            self._delta_docs[:merged_count],
+            removed,
+            list(self._session_ids[:len(self._base_lengths) + merged_count]),
+            self.indexed_until,
+        )
+
+        def apply(segment: Dict) -> None:
+            self._terms, self._vocab = segment["terms"], segment["vocab"]
+            self._indptr, self._docs, self._tfs = segment["indptr"], segment["postings_docs"], segment["postings_tfs"]
+            self._base_lengths = segment["doc_lengths"]
+            # Resumes added while the merge ran stay pending
+            self._delta_docs = self._delta_docs[merged_count:]
+            self._delta_lengths = self._delta_lengths[merged_count:]
+            self._delta_postings = {}
+            for doc_id, counts in self._delta_docs:
+                for term, tf in counts.items():
+                    docs, tfs = self._delta_postings.setdefault(term, ([], []))
+                    docs.append(doc_id)
+                    tfs.append(tf)
+            self._removed -= {doc_id for doc_id in removed if doc_id < len(self._base_lengths)}
+            self._lengths = None
+
+        return args, apply
+
+    async def merge(self) -> None:
+        """Merge pending resumes into the persisted segment off the event loop
+
+        Queries keep being served from the current segment meanwhile; resumes
+        added or removed during the merge are picked up by the next one.
+        """
+        started = self._start_merge()
+        if started is None:
+            return
+        args, apply = started
+        try:
+            apply(await asyncio.get_running_loop().run_in_executor(None, self._build_segment, *args))
+        finally:
+            self._merging = False
+
+    def merge_now(self) -> None:
+        started = self._start_merge()
+        if started is None:
+            return
+        args, apply = started
+        try:
+            apply(self._build_segment(*args))
+        finally:
+            self._merging = False
+
+    def snapshot(self) -> Dict:
+        return {
+            "resumes": len(self._doc_of),
+            "terms": len(self._terms),
+            "postings": int(len(self._docs)),
+            "pending": len(self._delta_docs),
+            "indexed_until": self.indexed_until.isoformat() if self.indexed_until else None,
+        }
+
+
+candidate_index = CandidateIndex()
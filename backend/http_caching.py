@@ -0,0 +1,28 @@
+import hashlib
+from typing import Optional
+
+# Clients may keep responses but must revalidate them with If-None-Match
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+
+def content_etag(data: bytes) -> str:
+    """Strong ETag for a response body"""
+    return '"' + hashlib.sha256(data).hexdigest()[:32] + '"'
+
+
+def file_etag(file_path: str, chunk_size: int = 64 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return '"' + digest.hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: Optional[str]) -> bool:
+    """Whether an If-None-Match header matches, using weak comparison as RFC 9110 requires"""
+    if not if_none_match or not etag:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (candidate.strip() for candidate in if_none_match.split(","))
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
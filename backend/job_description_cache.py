@@ -0,0 +1,218 @@
+import hashlib
+import re
+import uuid
+from collections import Counter, OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from pymongo import ReturnDocument
+
+# Prompt budget for the job description, matching the previous raw-text truncation
+COMPACT_TEXT_LIMIT = 2000
+MAX_KEYWORDS = 30
+
+_TOKEN_RE = re.compile(r"[a-z][a-z0-9+#./-]*[a-z0-9+#]|[a-z]", re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r"[ \t ]+")
+_BULLET_PREFIX_RE = re.compile(r"^\s*(?:[•●▪◦‣∙·*\-–—]|\d{1,2}[.)])\s*")
+
+_REQUIREMENT_HEADING_RE = re.compile(
+    r"^\s*(?:requirements|qualifications|(?:minimum|basic|required|preferred)\s+qualifications"
+    r"|must[\s-]haves?|what you(?:'ll| will) (?:need|bring)|who you are|skills)\b",
+    re.IGNORECASE,
+)
+_REQUIREMENT_LINE_RE = re.compile(
+    r"\b(?:required|requires?|must|proficien\w*|experience (?:with|in)|knowledge of|familiarity with|expertise in)\b",
+    re.IGNORECASE,
+)
+# Lines that add prompt tokens without telling the model anything about the role
+_BOILERPLATE_RE = re.compile(
+    r"\b(?:equal opportunity|eeo|without regard to|reasonable accommodation|benefits include|401\(?k\)?"
+    r"|paid time off|pto|health insurance|dental|vision insurance|salary range|compensation range"
+    r"|apply now|click apply|privacy policy|e-verify)\b",
+    re.IGNORECASE,
+)
+
+STOPWORDS = frozenset("""
+a about above across after all also an and any are as at be been being both but by can could day
+do does each either etc for from get has have having how if in include includes including into is
+it its itself just least like may more most must need needs new not of on one or other our out over
+own per plus role same should so some such team than that the their them then there these they this
+those through to under up use using very via was we well were what when where which while who will
+with within work working would year years you your yours ability able strong excellent good great
+experience experienced knowledge skills skill job position candidate candidates company responsibilities
+requirements qualifications preferred required including related relevant across help join looking
+""".split())
+
+TECH_SKILLS = frozenset("""
+python java javascript typescript go golang rust ruby php scala kotlin swift c c++ c# .net r matlab sql
+nosql html css react angular vue node.js node express django flask fastapi spring rails graphql rest
+grpc aws azure gcp docker kubernetes terraform ansible jenkins git linux bash ci/cd devops mongodb
+postgresql postgres mysql redis elasticsearch kafka rabbitmq spark hadoop airflow snowflake tableau
+excel pandas numpy pytorch tensorflow scikit-learn machine-learning ml ai nlp llm microservices
+serverless agile scrum jira figma salesforce sap seo analytics etl helm prometheus grafana
+""".split())
+
+PHRASE_SKILLS = (
+    "machine learning", "deep learning", "data analysis", "data engineering", "data science",
+    "project management", "product management", "distributed systems", "system design",
+    "unit testing", "test automation", "cloud infrastructure", "computer vision",
+    "natural language processing", "stakeholder management", "cross-functional",
+    "problem solving", "communication skills", "leadership",
+)
+
+
+def normalize_job_description(text: str) -> str:
+    """Collapse whitespace and drop blank and repeated lines"""
+    seen = set()
+    lines = []
+    for line in text.replace("\r\n", "\n").replace("\r", "\n").split("\n"):
+        line = _WHITESPACE_RE.sub(" ", line).strip()
+        key = line.lower()
+        if not line or key in seen:
+            continue
+        seen.add(key)
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def hash_job_description(normalized: str) -> str:
+    return hashlib.sha256(normalized.lower().encode("utf-8")).hexdigest()
+
+
+def tokenize(text: str) -> List[str]:
+    return [token.lower().rstrip(".") for token in _TOKEN_RE.findall(text)]
+
+
+def extract_keywords(normalized: str, limit: int = MAX_KEYWORDS) -> List[str]:
+    """Most frequent informative terms and known skill phrases, most frequent first"""
+    lowered = normalized.lower()
+    counts = Counter(
+        token for token in tokenize(normalized)
+        if token not in STOPWORDS and (len(token) > 2 or token in TECH_SKILLS)
+    )
+    for phrase in PHRASE_SKILLS:
+        occurrences = lowered.count(phrase)
+        if occurrences:
+            counts[phrase] += occurrences
+    # Known skills rank ahead of generic words with the same frequency
+    ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0] not in TECH_SKILLS, item[0]))
+    return [term for term, _ in ranked[:limit]]
+
+
+def extract_required_skills(normalized: str) -> List[str]:
+    """Skills named in requirement sections or requirement-phrased lines"""
+    skills: List[str] = []
+    in_requirements = False
+    for line in normalized.split("\n"):
+        if _REQUIREMENT_HEADING_RE.match(line) and len(line) < 60:
+            in_requirements = True
+            continue
+        # A short line ending in a colon starts another section
+        if line.endswith(":") and len(line) < 60:
+            in_requirements = False
+            continue
+        if not (in_requirements or _REQUIREMENT_LINE_RE.search(line)):
+            continue
+        lowered = line.lower()
+        for phrase in PHRASE_SKILLS:
+            if phrase in lowered and phrase not in skills:
+                skills.append(phrase)
+        for token in tokenize(line):
+            if token in TECH_SKILLS and token not in skills:
+                skills.append(token)
+    return skills
+
+
+def strip_boilerplate(normalized: str) -> str:
+    return "\n".join(line for line in normalized.split("\n") if not _BOILERPLATE_RE.search(line))
+
+
+def compact_job_description(normalized: str, limit: int = COMPACT_TEXT_LIMIT) -> str:
+    """Prompt-ready text without boilerplate, bullet glyphs or repeated lines"""
+    compact = "\n".join(
+        _BULLET_PREFIX_RE.sub("- ", line) if _BULLET_PREFIX_RE.match(line) else line
+        for line in strip_boilerplate(normalized).split("\n")
+    )
+    if len(compact) <= limit:
+        return compact
+    return compact[:limit].rsplit("\n", 1)[0] or compact[:limit]
+
+
+def build_job_description_document(raw_text: str) -> Dict:
+    normalized = normalize_job_description(raw_text)
+    relevant = strip_boilerplate(normalized)
+    return {
+        "id": str(uuid.uuid4()),
+        "hash": hash_job_description(normalized),
+        "normalized_text": normalized,
+        "compact_text": compact_job_description(normalized),
+        "keywords": extract_keywords(relevant),
+        "required_skills": extract_required_skills(relevant),
+        "created_at": datetime.utcnow(),
+    }
+
+
+class JobDescriptionStore:
+    """Shared store of preprocessed job descriptions, keyed by normalized-text hash"""
+
+    def __init__(self, collection, cache_size: int = 512):
+        self.collection = collection
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Dict]" = OrderedDict()
+
+    async def ensure_indexes(self) -> None:
+        await self.collection.create_index("hash", unique=True)
+        await self.collection.create_index("id", unique=True)
+
+    def _remember(self, document: Dict) -> Dict:
+        document.pop("_id", None)
+        self._cache[document["hash"]] = document
+        self._cache.move_to_end(document["hash"])
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return document
+
+    async def get_or_create(self, raw_text: str) -> Dict:
+        """Return the stored artifacts for a job description, computing them on first sight"""
+        job_hash = hash_job_description(normalize_job_description(raw_text))
+        now = datetime.utcnow()
+
+        cached = self._cache.get(job_hash)
+        if cached is not None:
+            self._cache.move_to_end(job_hash)
+            await self.collection.update_one(
+                {"hash": job_hash},
+                {"$inc": {"use_count": 1}, "$set": {"last_used_at": now}}
+            )
+            return cached
+
+        existing = await self.collection.find_one_and_update(
+            {"hash": job_hash},
+            {"$inc": {"use_count": 1}, "$set": {"last_used_at": now}},
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
+        )
+        if existing is not None:
+            return self._remember(existing)
+
+        document = build_job_description_document(raw_text)
+        # Upsert so concurrent first sightings of the same posting share one document
+        stored = await self.collection.find_one_and_update(
+            {"hash": job_hash},
+            {
+                "$setOnInsert": document,
+                "$inc": {"use_count": 1},
+                "$set": {"last_used_at": now}
+            },
+            projection={"_id": 0},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return self._remember(stored)
+
+    async def get(self, job_description_id: str) -> Optional[Dict]:
+        for document in self._cache.values():
+            if document["id"] == job_description_id:
+                return document
+        document = await self.collection.find_one({"id": job_description_id}, {"_id": 0})
+        return self._remember(document) if document else None
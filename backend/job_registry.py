@@ -0,0 +1,42 @@
+import asyncio
+import os
+from typing import Awaitable, Dict
+
+# How long shutdown waits for in-flight jobs before interrupting them
+SHUTDOWN_DRAIN_SECONDS = float(os.environ.get("SHUTDOWN_DRAIN_SECONDS", "25"))
+
+
+class JobRegistry:
+    """Tracks in-flight background jobs by session so shutdown can drain them"""
+
+    def __init__(self):
+        self._jobs: Dict[str, asyncio.Task] = {}
+        self.draining = False
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._jobs
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def start(self, session_id: str, job: Awaitable) -> asyncio.Task:
+        task = asyncio.ensure_future(job)
+        self._jobs[session_id] = task
+        task.add_done_callback(lambda _: self._jobs.pop(session_id, None))
+        return task
+
+    async def drain(self, timeout: float = SHUTDOWN_DRAIN_SECONDS) -> int:
+        """Stop taking jobs, wait for running ones, then cancel the rest; returns how many were cancelled"""
+        self.draining = True
+        tasks = list(self._jobs.values())
+        if not tasks:
+            return 0
+        _, pending = await asyncio.wait(tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        # Give cancelled jobs the chance to record where they stopped
+        await asyncio.gather(*pending, return_exceptions=True)
+        return len(pending)
+
+
+job_registry = JobRegistry()
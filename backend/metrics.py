@@ -0,0 +1,40 @@
+import threading
+from typing import Dict
+
+
+class ThroughputMetrics:
+    """Thread-safe running totals of work done per named backend"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals: Dict[str, Dict[str, float]] = {}
+
+    def record(self, name: str, seconds: float, pages: int = 0, bytes_processed: int = 0) -> None:
+        with self._lock:
+            totals = self._totals.setdefault(
+                name, {"runs": 0, "pages": 0, "bytes": 0, "seconds": 0.0}
+            )
+            totals["runs"] += 1
+            totals["pages"] += pages
+            totals["bytes"] += bytes_processed
+            totals["seconds"] += seconds
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            snapshot = {}
+            for name, totals in self._totals.items():
+                seconds = totals["seconds"] or 1e-9
+                snapshot[name] = {
+                    **totals,
+                    "pages_per_second": round(totals["pages"] / seconds, 2),
+                    "mb_per_second": round(totals["bytes"] / seconds / (1024 * 1024), 3),
+                }
+            return snapshot
+
+    def reset(self) -> None:
+        with self._lock:
+            self._totals.clear()
+
+
+# PDF text extraction throughput, keyed by backend name
+extraction_metrics = ThroughputMetrics()
@@ -1,13 +1,24 @@
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, BackgroundTasks
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, UploadFile, File, Form, Header, HTTPException, Request
+from fastapi.responses import FileResponse, Response
 from pydantic import BaseModel, Field
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 import uuid
+import base64
 import os
-from datetime import datetime
-import shutil
+from datetime import datetime, timedelta
+import json
+import asyncio
 from optimization_service import OptimizationService
+from metrics import extraction_metrics
+from job_description_cache import JobDescriptionStore, hash_job_description, normalize_job_description
+from request_coalescing import SingleFlight, upload_fingerprint
+from http_caching import REVALIDATE_CACHE_CONTROL, content_etag, etag_matches, file_etag
+from admission import AdmissionTicket, admission_controller, client_identity
+from job_registry import job_registry
+from candidate_index import candidate_index, job_description_terms
+from session_store import SESSION_TTL_GRACE_SECONDS, SESSION_TTL_SECONDS, SessionStore, remove_orphaned_files
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import DuplicateKeyError
 import logging
 
 # Database connection
@@ -17,20 +28,49 @@ db = client[os.environ['DB_NAME']]
 
 router = APIRouter(prefix="/api/optimize", tags=["optimization"])
 
-# Initialize optimization service
-optimization_service = OptimizationService()
+# The optimization service is built in the application lifespan (see startup)
+# so that importing this module stays cheap
+optimization_service: Optional[OptimizationService] = None
+WARM_UP_ON_STARTUP = os.environ.get("WARM_UP_ON_STARTUP", "true").lower() == "true"
+# Warm-up is an optimization: after this many failed attempts the service reports
+# ready anyway and loads the heavy modules on first use
+WARM_UP_ATTEMPTS = int(os.environ.get("WARM_UP_ATTEMPTS", "3"))
+WARM_UP_RETRY_SECONDS = 5
+service_state = {"started": False, "warm_up_enabled": WARM_UP_ON_STARTUP, "warmed_up": False, "warm_up_failed": False}
+
+# Session documents are compressed and expire; see session_store
+session_store = SessionStore(db.optimization_sessions)
+SESSION_SWEEP_INTERVAL_SECONDS = int(os.environ.get("SESSION_SWEEP_INTERVAL_SECONDS", "600"))
+
+# Job descriptions are preprocessed once and shared by every session that targets them
+job_description_store = JobDescriptionStore(db.job_descriptions)
+
+# Identical submissions (double clicks, client retries) attach to one session
+upload_coalescer = SingleFlight()
+DEDUP_WINDOW_SECONDS = int(os.environ.get("UPLOAD_DEDUP_WINDOW_SECONDS", "3600"))
+
+# Stages of process_resume_background, in order; sessions record the last one completed
+PIPELINE_STAGES = ("parse", "analyze", "optimize", "render")
+# A session left mid-pipeline this long without progress may be retried
+STALE_JOB_SECONDS = int(os.environ.get("STALE_JOB_SECONDS", "900"))
 
 # Pydantic models
 class OptimizationSession(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     original_filename: str
     extracted_text: str
-    job_description: str
+    job_description_id: str
     analysis: Optional[Dict] = None
     optimized_content: Optional[Dict] = None
-    status: str = "uploaded"  # uploaded, analyzing, optimized, completed, failed
+    preview_content: Optional[Dict] = None
+    status: str = "uploaded"  # uploaded, analyzing, optimized, completed, failed, interrupted
+    checkpoint: Optional[str] = None  # last completed stage in PIPELINE_STAGES
     created_at: datetime = Field(default_factory=datetime.utcnow)
     file_paths: Optional[Dict[str, str]] = None
+    upload_fingerprint: Optional[str] = None
+    client_id: Optional[str] = None  # idempotency keys are scoped to the client
+    idempotency_key: Optional[str] = None
+    upload_path: Optional[str] = None
 
 class UploadResponse(BaseModel):
     session_id: str
@@ -38,6 +78,7 @@ class UploadResponse(BaseModel):
     extracted_text: str
     status: str
     message: str
+    deduplicated: bool = False
 
 class AnalysisResponse(BaseModel):
     session_id: str
@@ -51,18 +92,183 @@ class SessionStatus(BaseModel):
     status: str
     progress: int
     message: str
+    preview_content: Optional[Dict] = None
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+async def startup(warm_up: bool = WARM_UP_ON_STARTUP):
+    """Build the optimization service; called from the application lifespan"""
+    global optimization_service
+    optimization_service = OptimizationService()
+    job_registry.draining = False
+    service_state["warmed_up"] = service_state["warm_up_failed"] = False
+    await ensure_indexes()
+    service_state["started"] = True
+    
+    service_state["sweeper_task"] = asyncio.create_task(_sweep_expired_sessions())
+    service_state["index_task"] = asyncio.create_task(_load_candidate_index())
+    service_state["recovery_task"] = asyncio.create_task(_resume_interrupted_sessions())
+    
+    if warm_up:
+        # Warm up off the event loop so liveness probes are answered meanwhile
+        service_state["warm_up_task"] = asyncio.create_task(_warm_up())
+
+async def _warm_up(attempts: int = WARM_UP_ATTEMPTS):
+    for attempt in range(1, attempts + 1):
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, optimization_service.warm_up)
+            service_state["warmed_up"] = True
+            return
+        except Exception as e:
+            logger.error(f"Warm-up attempt {attempt} of {attempts} failed: {str(e)}")
+        if attempt < attempts:
+            await asyncio.sleep(WARM_UP_RETRY_SECONDS)
+    logger.warning("Warm-up gave up; serving without it")
+    service_state["warm_up_failed"] = True
+
+async def _sweep_expired_sessions():
+    """Delete expired sessions and their generated files until shutdown"""
+    while True:
+        try:
+            purged = await session_store.purge_expired()
+            for purged_id in purged:
+                candidate_index.remove(purged_id)
+            orphaned = await asyncio.get_running_loop().run_in_executor(
+                None, remove_orphaned_files, optimization_service.upload_dir,
+                SESSION_TTL_SECONDS + SESSION_TTL_GRACE_SECONDS
+            )
+            if purged or orphaned:
+                logger.info(f"Expired {len(purged)} sessions and removed {orphaned} orphaned files")
+        except Exception as e:
+            logger.error(f"Session sweep failed: {str(e)}")
+        await asyncio.sleep(SESSION_SWEEP_INTERVAL_SECONDS)
+
+def _resume_skills(content: Optional[Dict]) -> List[str]:
+    skills = (content or {}).get("skills") or []
+    if isinstance(skills, dict):
+        return [skill for values in skills.values() if isinstance(values, list) for skill in values]
+    return [skill for skill in skills if isinstance(skill, str)]
+
+def _index_candidate(session_id: str, extracted_text: str, content: Optional[Dict], updated_at: datetime):
+    candidate_index.add(session_id, extracted_text, _resume_skills(content), updated_at)
+    merge_task = service_state.get("merge_task")
+    if candidate_index.pending >= candidate_index.merge_threshold and (merge_task is None or merge_task.done()):
+        service_state["merge_task"] = asyncio.create_task(_merge_candidate_index())
+
+async def _merge_candidate_index():
+    try:
+        await candidate_index.merge()
+    except Exception as e:
+        logger.error(f"Candidate index merge failed: {str(e)}")
+
+async def _load_candidate_index():
+    """Load the persisted candidate index and index sessions completed since it was saved"""
+    try:
+        await asyncio.get_running_loop().run_in_executor(None, candidate_index.load)
+        since = candidate_index.indexed_until
+        batch_size = 500
+        while True:
+            query = {"status": "completed"}
+            if since:
+                query["updated_at"] = {"$gte": since}
+            sessions = await session_store.find(
+                query,
+                {"id": 1, "extracted_text": 1, "optimized_content": 1, "updated_at": 1},
+                sort=[("updated_at", 1), ("id", 1)],
+                limit=batch_size
+            )
+            new_sessions = [session for session in sessions if session["id"] not in candidate_index]
+            for session in new_sessions:
+                _index_candidate(
+                    session["id"], session.get("extracted_text") or "",
+                    session.get("optimized_content"), session["updated_at"]
+                )
+            if len(sessions) < batch_size or not new_sessions:
+                break
+            since = sessions[-1]["updated_at"]
+        await candidate_index.merge()
+    except Exception as e:
+        logger.error(f"Candidate index load failed: {str(e)}")
+
+async def _resume_interrupted_sessions():
+    """Pick up sessions whose processing was interrupted by the last shutdown"""
+    try:
+        sessions = await session_store.find(
+            {"status": "interrupted"},
+            {"id": 1, "checkpoint": 1, "job_description_id": 1},
+            sort=[("updated_at", 1)],
+            limit=1000
+        )
+        for session in sessions:
+            ticket = admission_controller.admit("system:recovery", "bulk", enforce_quotas=False)
+            try:
+                await _resume_session(session, ticket)
+            except HTTPException as e:
+                await session_store.update(session["id"], {
+                    "status": "failed", "error_message": e.detail, "updated_at": datetime.utcnow()
+                })
+        if sessions:
+            logger.info(f"Resumed {len(sessions)} interrupted sessions")
+    except Exception as e:
+        logger.error(f"Resuming interrupted sessions failed: {str(e)}")
+
+async def shutdown():
+    # Report not ready and finish in-flight jobs before tearing anything down
+    service_state["started"] = False
+    interrupted = await job_registry.drain()
+    if interrupted:
+        logger.warning(f"Interrupted {interrupted} jobs at shutdown; they resume on next startup")
+    
+    for task_name in ("warm_up_task", "sweeper_task", "index_task", "recovery_task"):
+        task = service_state.pop(task_name, None)
+        if task is not None and not task.done():
+            task.cancel()
+    merge_task = service_state.pop("merge_task", None)
+    if merge_task is not None:
+        # A running merge holds the index; let it finish before the final save
+        await asyncio.gather(merge_task, return_exceptions=True)
+    try:
+        # Persist resumes indexed since the last merge
+        candidate_index.merge_now()
+    except Exception as e:
+        logger.error(f"Candidate index save failed: {str(e)}")
+    if optimization_service is not None:
+        optimization_service.shutdown()
+    service_state["started"] = False
+
+def is_ready() -> bool:
+    warm_up_settled = service_state["warmed_up"] or service_state["warm_up_failed"]
+    return service_state["started"] and (warm_up_settled or not service_state["warm_up_enabled"])
+
+def get_optimization_service() -> OptimizationService:
+    if optimization_service is None:
+        raise HTTPException(status_code=503, detail="Optimization service is starting up")
+    return optimization_service
+
+async def ensure_indexes():
+    await job_description_store.ensure_indexes()
+    await session_store.ensure_indexes()
+
 @router.post("/upload", response_model=UploadResponse)
 async def upload_resume(
-    background_tasks: BackgroundTasks,
+    request: Request,
     file: UploadFile = File(...),
-    job_description: str = Form(...)
+    job_description: str = Form(...),
+    idempotency_key: Optional[str] = Header(None, max_length=128),
+    x_priority: Optional[str] = Header(None)
 ):
-    """Upload resume file and job description for optimization"""
+    """Upload resume file and job description for optimization
+    
+    Repeated submissions of the same file and job description, or of the same
+    ``Idempotency-Key``, return the existing session instead of starting a new one.
+    New work is subject to admission control and may be rejected with 429;
+    ``X-Priority: bulk`` queues it behind interactive uploads.
+    """
+    
+    if job_registry.draining:
+        raise HTTPException(status_code=503, detail="Service is shutting down. Please retry shortly.")
     
     # Validate file type
     if not file.filename:
@@ -91,117 +297,308 @@ async def upload_resume(
         )
     
     try:
-        # Generate session ID
-        session_id = str(uuid.uuid4())
+        client_id = client_identity(request)
+        file_content = await file.read()
+        job_hash = hash_job_description(normalize_job_description(job_description))
+        fingerprint = upload_fingerprint(file_content, job_hash)
         
-        # Save uploaded file
-        upload_dir = "/app/backend/uploads"
-        os.makedirs(upload_dir, exist_ok=True)
+        if idempotency_key:
+            session = await session_store.find_one(
+                {"client_id": client_id, "idempotency_key": idempotency_key},
+                {"id": 1, "original_filename": 1, "status": 1, "upload_fingerprint": 1}
+            )
+            if session and session.get("upload_fingerprint") != fingerprint:
+                raise HTTPException(
+                    status_code=422,
+                    detail="Idempotency-Key was already used for a different upload"
+                )
+            if session and session["status"] == "failed":
+                # A failed attempt does not hold on to the key; the upload starts over
+                await session_store.update(session["id"], {}, unset=["idempotency_key"])
+            elif session:
+                return _duplicate_upload_response(session)
         
-        file_path = os.path.join(upload_dir, f"{session_id}_{file.filename}")
-        
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        # Create initial session record
-        session_data = OptimizationSession(
-            id=session_id,
-            original_filename=file.filename,
-            extracted_text="",  # Will be populated during processing
-            job_description=job_description,
-            status="uploaded"
-        )
-        
-        # Save to database
-        await db.optimization_sessions.insert_one(session_data.dict())
+        async def find_or_create_session() -> Dict:
+            duplicate = await session_store.find_one(
+                {
+                    "upload_fingerprint": fingerprint,
+                    "status": {"$ne": "failed"},
+                    "created_at": {"$gte": datetime.utcnow() - timedelta(seconds=DEDUP_WINDOW_SECONDS)}
+                },
+                {"id": 1, "original_filename": 1, "status": 1},
+                sort=[("created_at", -1)]
+            )
+            if duplicate:
+                return {**duplicate, "deduplicated": True}
+            
+            # Only new work counts against the client's quotas
+            ticket = admission_controller.admit(client_id, admission_controller.lane_for(client_id, x_priority))
+            
+            try:
+                # Generate session ID
+                session_id = str(uuid.uuid4())
+                
+                # Save uploaded file
+                upload_dir = get_optimization_service().upload_dir
+                os.makedirs(upload_dir, exist_ok=True)
+                
+                file_path = os.path.join(upload_dir, f"{session_id}_{file.filename}")
+                
+                with open(file_path, "wb") as buffer:
+                    buffer.write(file_content)
+                
+                # Reuse the preprocessed job description if another session already sent it
+                job = await job_description_store.get_or_create(job_description)
+                
+                # Create initial session record
+                session_data = OptimizationSession(
+                    id=session_id,
+                    original_filename=file.filename,
+                    extracted_text="",  # Will be populated during processing
+                    job_description_id=job["id"],
+                    status="uploaded",
+                    upload_fingerprint=fingerprint,
+                    client_id=client_id,
+                    idempotency_key=idempotency_key,
+                    upload_path=file_path
+                )
+                
+                # Save to database
+                await session_store.insert(session_data.dict())
+                
+            except BaseException:
+                ticket.release()
+                raise
+            # Start background processing once an execution slot is free
+            _start_processing(ticket, session_id, job)
+            return {"id": session_id, "original_filename": file.filename, "status": "uploaded"}
         
-        # Start background processing
-        background_tasks.add_task(
-            process_resume_background, 
-            session_id, 
-            file_path, 
-            job_description
-        )
+        session, shared = await upload_coalescer.do(fingerprint, find_or_create_session)
+        if shared or session.get("deduplicated"):
+            return _duplicate_upload_response(session)
         
         return UploadResponse(
-            session_id=session_id,
+            session_id=session["id"],
             original_filename=file.filename,
             extracted_text="Processing...",
             status="uploaded",
             message="File uploaded successfully. Processing will begin shortly."
         )
         
+    except HTTPException:
+        raise
+    except DuplicateKeyError:
+        # A concurrent upload with different content claimed the same key
+        raise HTTPException(
+            status_code=422,
+            detail="Idempotency-Key was already used for a different upload"
+        )
     except Exception as e:
         logger.error(f"Upload error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
 
-async def process_resume_background(session_id: str, file_path: str, job_description: str):
-    """Background task to process resume optimization"""
+def _duplicate_upload_response(session: Dict) -> UploadResponse:
+    return UploadResponse(
+        session_id=session["id"],
+        original_filename=session["original_filename"],
+        extracted_text="Processing...",
+        status=session["status"],
+        message="Identical upload already submitted. Returning the existing session.",
+        deduplicated=True
+    )
+
+async def process_resume_background(session_id: str, job: Dict):
+    """Background task to process resume optimization
+    
+    Each stage stores its output together with ``checkpoint`` as it completes,
+    so a retried or resumed session continues after its last completed stage.
+    """
     try:
-        # Update status to analyzing
-        await db.optimization_sessions.update_one(
-            {"id": session_id},
-            {"$set": {"status": "analyzing", "updated_at": datetime.utcnow()}}
-        )
+        service = get_optimization_service()
+        session = await session_store.get(session_id, [
+            "checkpoint", "upload_path", "extracted_text", "preview_content", "analysis", "optimized_content"
+        ])
+        if session is None:
+            # Deleted before processing started
+            return
+        completed = PIPELINE_STAGES.index(session["checkpoint"]) + 1 if session.get("checkpoint") else 0
+        job_keywords = list(dict.fromkeys(job["required_skills"] + job["keywords"]))
         
-        # Process resume
-        result = await optimization_service.process_resume(file_path, job_description)
+        if completed < 1:
+            # Update status to analyzing
+            await session_store.update(session_id, {"status": "analyzing", "updated_at": datetime.utcnow()})
+            
+            file_path = session.get("upload_path")
+            if not file_path or not os.path.exists(file_path):
+                raise Exception("Uploaded file is no longer available; please upload it again")
+            parsed = await asyncio.get_running_loop().run_in_executor(None, service.parse_resume, file_path)
+            
+            # Locally segmented structure is available long before the LLM responds
+            await session_store.update(session_id, {
+                "extracted_text": parsed["extracted_text"],
+                "preview_content": parsed["structured_content"],
+                "checkpoint": "parse",
+                "updated_at": datetime.utcnow()
+            })
+            session.update(extracted_text=parsed["extracted_text"], preview_content=parsed["structured_content"])
+            
+            # Clean up uploaded file; later stages only need the parsed text
+            if os.path.exists(file_path):
+                os.remove(file_path)
         
-        # Update status to optimized
-        await db.optimization_sessions.update_one(
-            {"id": session_id},
-            {
-                "$set": {
-                    "extracted_text": result["extracted_text"],
-                    "analysis": result["analysis"],
-                    "optimized_content": result["optimized_content"],
-                    "status": "optimized",
-                    "updated_at": datetime.utcnow()
-                }
-            }
-        )
+        parsed = {"extracted_text": session["extracted_text"], "structured_content": session["preview_content"]}
+        resume_prompt_text = service.resume_prompt_text(parsed)
+        
+        if completed < 2:
+            await session_store.update(session_id, {"status": "analyzing", "updated_at": datetime.utcnow()})
+            session["analysis"] = await service.optimizer.analyze_resume_and_job(
+                resume_prompt_text, job["compact_text"], job_keywords=job_keywords
+            )
+            await session_store.update(session_id, {
+                "analysis": session["analysis"],
+                "checkpoint": "analyze",
+                "updated_at": datetime.utcnow()
+            })
+        
+        if completed < 3:
+            session["optimized_content"] = await service.optimizer.optimize_resume_content(
+                resume_prompt_text, job["compact_text"], session["analysis"],
+                fallback=parsed["structured_content"], job_keywords=job_keywords
+            )
+            
+            # Update status to optimized
+            await session_store.update(session_id, {
+                "optimized_content": session["optimized_content"],
+                "checkpoint": "optimize",
+                "status": "optimized",
+                "updated_at": datetime.utcnow()
+            })
         
         # Generate documents
-        file_paths = await optimization_service.generate_documents(
-            result["optimized_content"], 
-            session_id
-        )
+        file_paths = await service.generate_documents(session["optimized_content"], session_id)
+        
+        # Serialize the final results once so /results can serve them as-is
+        results_json = AnalysisResponse(
+            session_id=session_id,
+            analysis=session["analysis"],
+            optimized_content=session["optimized_content"],
+            status="completed",
+            message="Optimization results retrieved successfully"
+        ).json()
         
         # Update with file paths and mark as completed
-        await db.optimization_sessions.update_one(
-            {"id": session_id},
-            {
-                "$set": {
-                    "file_paths": file_paths,
-                    "status": "completed",
-                    "updated_at": datetime.utcnow()
-                }
-            }
-        )
+        completed_at = datetime.utcnow()
+        await session_store.update(session_id, {
+            "file_paths": file_paths,
+            "file_etags": {
+                file_format: file_etag(path) for file_format, path in file_paths.items()
+            },
+            "results_json": results_json,
+            "results_etag": content_etag(results_json.encode("utf-8")),
+            "checkpoint": "render",
+            "status": "completed",
+            "updated_at": completed_at
+        })
         
-        # Clean up uploaded file
-        if os.path.exists(file_path):
-            os.remove(file_path)
+        try:
+            # Make the resume searchable by /rank; the session is complete either way
+            _index_candidate(session_id, session["extracted_text"], session["optimized_content"], completed_at)
+        except Exception as e:
+            logger.error(f"Indexing session {session_id} for ranking failed: {str(e)}")
             
     except Exception as e:
         logger.error(f"Background processing error for session {session_id}: {str(e)}")
         # Update status to failed
-        await db.optimization_sessions.update_one(
-            {"id": session_id},
-            {
-                "$set": {
-                    "status": "failed",
-                    "error_message": str(e),
-                    "updated_at": datetime.utcnow()
-                }
-            }
+        await session_store.update(session_id, {
+            "status": "failed",
+            "error_message": str(e),
+            "updated_at": datetime.utcnow()
+        })
+
+async def _run_admitted(ticket: AdmissionTicket, session_id: str, job: Dict):
+    try:
+        await admission_controller.run(ticket, process_resume_background, session_id, job)
+    except asyncio.CancelledError:
+        # Shutdown ran out of drain time, either while the job was still queued for a
+        # slot or mid-pipeline; the next startup resumes from the last checkpoint
+        logger.warning(f"Processing of session {session_id} was interrupted")
+        await session_store.update(session_id, {"status": "interrupted", "updated_at": datetime.utcnow()})
+        raise
+
+def _start_processing(ticket: AdmissionTicket, session_id: str, job: Dict):
+    """Run the pipeline for a session once an execution slot is free"""
+    job_registry.start(session_id, _run_admitted(ticket, session_id, job))
+
+# Status a session returns to when processing resumes after its checkpoint
+RESUME_STATUS = {None: "uploaded", "parse": "analyzing", "analyze": "analyzing", "optimize": "optimized"}
+
+async def _resume_session(session: Dict, ticket: AdmissionTicket):
+    if session.get("checkpoint") == "render":
+        # Documents and results were saved; only the final status was lost
+        ticket.release()
+        await session_store.update(session["id"], {"status": "completed", "updated_at": datetime.utcnow()})
+        return
+    try:
+        job = await job_description_store.get(session["job_description_id"])
+        if job is None:
+            raise HTTPException(status_code=409, detail="The session's job description no longer exists")
+        await session_store.update(session["id"], {
+            "status": RESUME_STATUS[session.get("checkpoint")],
+            "error_message": None,
+            "updated_at": datetime.utcnow()
+        })
+    except BaseException:
+        ticket.release()
+        raise
+    _start_processing(ticket, session["id"], job)
+
+@router.post("/retry/{session_id}")
+async def retry_optimization(session_id: str, request: Request):
+    """Resume a failed or interrupted session from its last completed stage"""
+    
+    if job_registry.draining:
+        raise HTTPException(status_code=503, detail="Service is shutting down. Please retry shortly.")
+    
+    session = await session_store.get(
+        session_id, ["id", "status", "checkpoint", "job_description_id", "upload_path", "updated_at"]
+    )
+    
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    # A session stuck mid-pipeline without a running job was lost with its worker
+    stale = datetime.utcnow() - (session.get("updated_at") or datetime.min) > timedelta(seconds=STALE_JOB_SECONDS)
+    retryable = session["status"] in ["failed", "interrupted"] or (
+        session["status"] in ["uploaded", "analyzing", "optimized"] and stale
+    )
+    if session_id in job_registry or not retryable:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Session cannot be retried. Current status: {session['status']}"
         )
+    if session.get("checkpoint") == "render":
+        raise HTTPException(status_code=409, detail="Session already completed; its results are available")
+    if not session.get("checkpoint") and not os.path.exists(session.get("upload_path") or ""):
+        raise HTTPException(status_code=409, detail="Uploaded file is no longer available; please upload it again")
+    
+    client_id = client_identity(request)
+    ticket = admission_controller.admit(client_id, admission_controller.lane_for(client_id))
+    await _resume_session(session, ticket)
+    
+    return {
+        "session_id": session_id,
+        "status": RESUME_STATUS[session.get("checkpoint")],
+        "resumed_from": session.get("checkpoint"),
+        "message": "Processing resumed from the last completed stage."
+    }
 
 @router.get("/status/{session_id}", response_model=SessionStatus)
 async def get_optimization_status(session_id: str):
     """Get the current status of optimization process"""
     
-    session = await db.optimization_sessions.find_one({"id": session_id})
+    session = await session_store.get(
+        session_id, ["status", "error_message", "preview_content"]
+    )
     
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -212,7 +609,8 @@ async def get_optimization_status(session_id: str):
         "analyzing": 30,
         "optimized": 80,
         "completed": 100,
-        "failed": 0
+        "failed": 0,
+        "interrupted": 0
     }
     
     status_messages = {
@@ -220,21 +618,27 @@ async def get_optimization_status(session_id: str):
         "analyzing": "Analyzing resume and optimizing content...",
         "optimized": "Content optimized, generating documents...",
         "completed": "Optimization completed successfully!",
-        "failed": f"Optimization failed: {session.get('error_message', 'Unknown error')}"
+        "failed": f"Optimization failed: {session.get('error_message') or 'Unknown error'}",
+        "interrupted": "Processing was interrupted and will resume where it stopped."
     }
     
     return SessionStatus(
         session_id=session_id,
         status=session["status"],
         progress=progress_map.get(session["status"], 0),
-        message=status_messages.get(session["status"], "Processing...")
+        message=status_messages.get(session["status"], "Processing..."),
+        preview_content=session.get("preview_content")
     )
 
 @router.get("/results/{session_id}", response_model=AnalysisResponse)
-async def get_optimization_results(session_id: str):
-    """Get the optimization results for a session"""
+async def get_optimization_results(session_id: str, if_none_match: Optional[str] = Header(None)):
+    """Get the optimization results for a session
+    
+    Completed sessions are served from their pre-serialized payload with a
+    strong ETag; a matching ``If-None-Match`` gets an empty 304.
+    """
     
-    session = await db.optimization_sessions.find_one({"id": session_id})
+    session = await session_store.get(session_id, ["status", "results_etag"])
     
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -245,6 +649,22 @@ async def get_optimization_results(session_id: str):
             detail=f"Results not ready. Current status: {session['status']}"
         )
     
+    etag = session.get("results_etag")
+    cache_headers = {"ETag": etag, "Cache-Control": REVALIDATE_CACHE_CONTROL} if etag else {}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=cache_headers)
+    
+    # Only fetch the large fields once we know they have to be sent
+    fields = ["results_json"] if etag else ["analysis", "optimized_content"]
+    session.update(await session_store.get(session_id, fields) or {})
+    
+    if session.get("results_json"):
+        return Response(
+            content=session["results_json"],
+            media_type="application/json",
+            headers=cache_headers
+        )
+    
     return AnalysisResponse(
         session_id=session_id,
         analysis=session.get("analysis", {}),
@@ -254,13 +674,14 @@ async def get_optimization_results(session_id: str):
     )
 
 @router.get("/download/{session_id}")
-async def download_optimized_resume(session_id: str, format: str = "pdf"):
+async def download_optimized_resume(session_id: str, format: str = "pdf",
+                                    if_none_match: Optional[str] = Header(None)):
     """Download the optimized resume in specified format"""
     
     if format not in ["pdf", "docx"]:
         raise HTTPException(status_code=400, detail="Invalid format. Use 'pdf' or 'docx'")
     
-    session = await db.optimization_sessions.find_one({"id": session_id})
+    session = await session_store.get(session_id, ["status", "file_paths", "file_etags"])
     
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -277,6 +698,11 @@ async def download_optimized_resume(session_id: str, format: str = "pdf"):
     if not file_path or not os.path.exists(file_path):
         raise HTTPException(status_code=404, detail=f"Optimized {format.upper()} file not found")
     
+    etag = (session.get("file_etags") or {}).get(format)
+    cache_headers = {"ETag": etag, "Cache-Control": REVALIDATE_CACHE_CONTROL} if etag else {}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=cache_headers)
+    
     # Determine content type
     content_type = "application/pdf" if format == "pdf" else "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
     
@@ -285,39 +711,154 @@ async def download_optimized_resume(session_id: str, format: str = "pdf"):
     return FileResponse(
         path=file_path,
         media_type=content_type,
-        filename=filename
+        filename=filename,
+        headers=cache_headers
     )
 
 @router.delete("/session/{session_id}")
 async def delete_optimization_session(session_id: str):
     """Delete optimization session and associated files"""
     
-    session = await db.optimization_sessions.find_one({"id": session_id})
+    # Removes the generated files and any leftover upload along with the record
+    session = await session_store.delete(session_id)
     
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    # Clean up files
-    file_paths = session.get("file_paths", {})
-    for file_path in file_paths.values():
-        if os.path.exists(file_path):
-            try:
-                os.remove(file_path)
-            except Exception as e:
-                logger.warning(f"Failed to delete file {file_path}: {str(e)}")
-    
-    # Delete from database
-    await db.optimization_sessions.delete_one({"id": session_id})
+    candidate_index.remove(session_id)
     
     return {"message": "Session deleted successfully"}
 
+# Fields returned by /sessions unless the caller selects others
+SESSION_LIST_DEFAULT_FIELDS = ("id", "original_filename", "status", "created_at", "updated_at")
+SESSION_LIST_SELECTABLE_FIELDS = frozenset(SESSION_LIST_DEFAULT_FIELDS) | {
+    "job_description_id", "error_message", "extracted_text", "analysis", "optimized_content",
+    "preview_content", "file_paths"
+}
+SESSION_LIST_MAX_LIMIT = 100
+
+def _encode_session_cursor(session: Dict) -> str:
+    payload = json.dumps([session["created_at"].isoformat(), session["id"]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+def _decode_session_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, session_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(created_at), str(session_id)
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from e
+
 @router.get("/sessions")
-async def list_optimization_sessions(limit: int = 10, skip: int = 0):
-    """List recent optimization sessions"""
+async def list_optimization_sessions(
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    fields: Optional[str] = None
+):
+    """List recent optimization sessions, newest first
+    
+    Pages are addressed by the opaque ``next_cursor`` of the previous page, so
+    every page costs the same index range scan regardless of its depth.
+    ``fields`` is a comma-separated selection from SESSION_LIST_SELECTABLE_FIELDS.
+    """
+    
+    limit = max(1, min(limit, SESSION_LIST_MAX_LIMIT))
     
-    sessions = await db.optimization_sessions.find(
-        {},
-        {"_id": 0}  # Exclude MongoDB _id field
-    ).sort("created_at", -1).skip(skip).limit(limit).to_list(limit)
+    selected: List[str] = list(SESSION_LIST_DEFAULT_FIELDS)
+    if fields:
+        requested = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = sorted(set(requested) - SESSION_LIST_SELECTABLE_FIELDS)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+        # id and created_at are always needed to build the next cursor
+        selected = list(dict.fromkeys(["id", "created_at"] + requested))
+    projection = {field: 1 for field in selected}
+    
+    conditions = []
+    if status:
+        conditions.append({"status": status})
+    if created_after or created_before:
+        created_range = {}
+        if created_after:
+            created_range["$gte"] = created_after
+        if created_before:
+            created_range["$lt"] = created_before
+        conditions.append({"created_at": created_range})
+    if cursor:
+        cursor_created_at, cursor_id = _decode_session_cursor(cursor)
+        conditions.append({"$or": [
+            {"created_at": {"$lt": cursor_created_at}},
+            {"created_at": cursor_created_at, "id": {"$lt": cursor_id}}
+        ]})
+    query = {"$and": conditions} if conditions else {}
+    
+    # Fetch one extra row to learn whether another page exists
+    sessions = await session_store.find(
+        query, projection, sort=[("created_at", -1), ("id", -1)], limit=limit + 1
+    )
+    
+    has_more = len(sessions) > limit
+    sessions = sessions[:limit]
+    
+    return {
+        "sessions": sessions,
+        "count": len(sessions),
+        "next_cursor": _encode_session_cursor(sessions[-1]) if has_more else None
+    }
+
+class RankRequest(BaseModel):
+    job_description: str
+    k: int = 10
+
+RANK_MAX_K = 100
+
+@router.post("/rank")
+async def rank_candidates(request: RankRequest):
+    """Rank stored resumes against a job description, best match first"""
+    
+    if not request.job_description or len(request.job_description.strip()) < 50:
+        raise HTTPException(
+            status_code=400, 
+            detail="Job description is required and must be at least 50 characters long."
+        )
+    k = max(1, min(request.k, RANK_MAX_K))
+    
+    ranked = candidate_index.search(job_description_terms(request.job_description), k)
+    scores = dict(ranked)
+    
+    sessions = await session_store.find(
+        {"id": {"$in": list(scores)}},
+        {"id": 1, "original_filename": 1, "status": 1, "created_at": 1},
+        sort=[("created_at", -1)],
+        limit=len(scores)
+    )
+    # Sessions deleted since they were indexed are dropped
+    sessions.sort(key=lambda session: scores[session["id"]], reverse=True)
+    
+    return {
+        "candidates": [
+            {
+                "session_id": session["id"],
+                "score": round(scores[session["id"]], 4),
+                "original_filename": session.get("original_filename"),
+                "status": session.get("status"),
+                "created_at": session.get("created_at")
+            }
+            for session in sessions
+        ],
+        "indexed": len(candidate_index)
+    }
+
+@router.get("/metrics")
+async def get_optimization_metrics():
+    """Report PDF extraction throughput and admission queue state for this process"""
     
-    return {"sessions": sessions, "count": len(sessions)}
\ No newline at end of file
+    return {
+        "pdf_extraction": extraction_metrics.snapshot(),
+        "admission": admission_controller.snapshot(),
+        "candidate_index": candidate_index.snapshot(),
+        "jobs_in_flight": len(job_registry)
+    }
\ No newline at end of file
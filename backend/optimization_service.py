@@ -1,26 +1,26 @@
 import os
 import uuid
 import asyncio
+import importlib
 from datetime import datetime
+from functools import lru_cache
 from typing import Dict, List, Optional
-import pdfplumber
-import docx
-from docx import Document
-from docx.shared import Inches
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.enum.style import WD_STYLE_TYPE
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib import colors
-from emergentintegrations.llm.chat import LlmChat, UserMessage
 from dotenv import load_dotenv
+from streaming_json import IncrementalJSONParser, parse_json_response
+from resume_segmenter import ResumeLine, ResumeSegmenter
+from pdf_backends import PdfExtractor
 import json
 import re
 
 load_dotenv()
 
+# Heavy document and LLM libraries are imported on first use (or during warm-up)
+# so importing this module stays cheap; see OptimizationService.warm_up
+HEAVY_MODULES = ("docx", "reportlab.platypus", "pdfplumber", "PyPDF2", "emergentintegrations.llm.chat")
+
+# Shared so the worker pool for long PDFs is created once per process
+pdf_extractor = PdfExtractor(backend=os.environ.get("PDF_EXTRACTION_BACKEND") or None)
+
 class ResumeParser:
     """Handles parsing of uploaded resume files"""
     
@@ -28,17 +28,15 @@ class ResumeParser:
     def extract_text_from_pdf(file_path: str) -> str:
         """Extract text from PDF file"""
         try:
-            with pdfplumber.open(file_path) as pdf:
-                text = ""
-                for page in pdf.pages:
-                    text += page.extract_text() + "\n"
-                return text.strip()
+            return pdf_extractor.extract_text(file_path)
         except Exception as e:
             raise Exception(f"Error parsing PDF: {str(e)}")
     
     @staticmethod 
     def extract_text_from_docx(file_path: str) -> str:
         """Extract text from DOCX file"""
+        import docx
+        
         try:
             doc = docx.Document(file_path)
             text = ""
@@ -47,16 +45,64 @@ class ResumeParser:
             return text.strip()
         except Exception as e:
             raise Exception(f"Error parsing DOCX: {str(e)}")
+    
+    @staticmethod
+    def extract_lines_from_pdf(file_path: str) -> List[ResumeLine]:
+        """Extract text lines from PDF file, with layout hints when the backend provides them"""
+        try:
+            return pdf_extractor.extract_lines(file_path)
+        except Exception as e:
+            raise Exception(f"Error parsing PDF: {str(e)}")
+    
+    @staticmethod
+    def extract_lines_from_docx(file_path: str) -> List[ResumeLine]:
+        """Extract paragraphs from DOCX file with heading and list hints from paragraph styles"""
+        import docx
+        
+        try:
+            doc = docx.Document(file_path)
+        except Exception as e:
+            raise Exception(f"Error parsing DOCX: {str(e)}")
+        
+        lines = []
+        for paragraph in doc.paragraphs:
+            text = paragraph.text.strip()
+            if not text:
+                continue
+            style_name = (paragraph.style.name if paragraph.style is not None else "") or ""
+            runs = [run for run in paragraph.runs if run.text.strip()]
+            properties = paragraph._p.pPr
+            lines.append(ResumeLine(
+                text=text,
+                heading_hint=style_name.startswith(("Heading", "Title"))
+                or (bool(runs) and all(run.bold for run in runs) and len(text.split()) <= 5),
+                bullet_hint="List" in style_name or (properties is not None and properties.numPr is not None),
+            ))
+        return lines
 
 class ResumeOptimizer:
     """Handles AI-powered resume optimization"""
     
     def __init__(self):
+        # Checked on first use so the service can start (and report health) without a key
         self.api_key = os.environ.get('EMERGENT_LLM_KEY')
+    
+    def _require_api_key(self) -> str:
         if not self.api_key:
             raise ValueError("EMERGENT_LLM_KEY not found in environment variables")
+        return self.api_key
+    
+    @staticmethod
+    def _job_keywords_block(job_keywords: Optional[List[str]]) -> str:
+        if not job_keywords:
+            return ""
+        return f"""
+        KEY REQUIREMENTS (pre-extracted from the job description):
+        {", ".join(job_keywords)}
+"""
     
-    async def analyze_resume_and_job(self, resume_text: str, job_description: str) -> Dict:
+    async def analyze_resume_and_job(self, resume_text: str, job_description: str,
+                                     job_keywords: Optional[List[str]] = None) -> Dict:
         """Analyze resume against job description and provide optimization suggestions"""
         
         session_id = f"resume_analysis_{uuid.uuid4().hex[:8]}"
@@ -95,16 +141,19 @@ class ResumeOptimizer:
 
         JOB DESCRIPTION:
         {job_description[:2000]}  # Limit to avoid token limits
-
+        {self._job_keywords_block(job_keywords)}
         RESUME CONTENT:
         {resume_text[:3000]}  # Limit to avoid token limits
 
         Provide detailed analysis and actionable suggestions to improve ATS compatibility and job match score.
         """
 
+        from emergentintegrations.llm.chat import LlmChat, UserMessage
+        api_key = self._require_api_key()
+        
         try:
             chat = LlmChat(
-                api_key=self.api_key,
+                api_key=api_key,
                 session_id=session_id,
                 system_message=system_message
             ).with_model("openai", "gpt-4o-mini")
@@ -112,11 +161,11 @@ class ResumeOptimizer:
             message = UserMessage(text=user_message)
             response = await chat.send_message(message)
             
-            # Parse JSON response 
-            try:
-                analysis_result = json.loads(response)
+            # Parse JSON response, repairing truncated output
+            analysis_result = parse_json_response(response)
+            if analysis_result:
                 return analysis_result
-            except json.JSONDecodeError:
+            else:
                 # Fallback if response is not JSON
                 return {
                     "analysis": {
@@ -139,8 +188,14 @@ class ResumeOptimizer:
             print(f"Error in AI analysis: {str(e)}")
             raise Exception(f"Failed to analyze resume: {str(e)}")
 
-    async def optimize_resume_content(self, resume_text: str, job_description: str, analysis: Dict) -> Dict:
-        """Generate optimized resume content based on analysis"""
+    async def optimize_resume_content(self, resume_text: str, job_description: str, analysis: Dict,
+                                      fallback: Optional[Dict] = None,
+                                      job_keywords: Optional[List[str]] = None) -> Dict:
+        """Generate optimized resume content based on analysis
+        
+        Sections missing from the response, or cut short by truncation, are
+        taken from ``fallback``, the locally segmented resume.
+        """
         
         session_id = f"resume_optimization_{uuid.uuid4().hex[:8]}"
         
@@ -150,9 +205,11 @@ class ResumeOptimizer:
         3. Uses ATS-friendly formatting
         4. Improves impact statements with quantified results
         5. Ensures clean, simple structure
+        6. Keeps every additional section of the original (projects, awards, publications, ...) in additional_sections
         
         Return the optimized resume in JSON format:
         {
+            "summary": "Optimized professional summary...",
             "personal_info": {
                 "name": "Full Name",
                 "email": "email@example.com", 
@@ -161,7 +218,6 @@ class ResumeOptimizer:
                 "linkedin": "linkedin url",
                 "website": "portfolio url"
             },
-            "summary": "Optimized professional summary...",
             "experience": [
                 {
                     "company": "Company Name",
@@ -194,6 +250,12 @@ class ResumeOptimizer:
                     "issuer": "Issuing Organization", 
                     "date": "MM/YYYY"
                 }
+            ],
+            "additional_sections": [
+                {
+                    "heading": "Section Heading",
+                    "items": ["Entry or achievement"]
+                }
             ]
         }"""
         
@@ -208,25 +270,36 @@ class ResumeOptimizer:
 
         JOB DESCRIPTION FOR CONTEXT:
         {job_description[:1500]}
-
+        {self._job_keywords_block(job_keywords)}
         Please create an optimized version that addresses the identified weaknesses and incorporates the missing keywords naturally.
         """
 
+        from emergentintegrations.llm.chat import LlmChat, UserMessage
+        api_key = self._require_api_key()
+        
         try:
             chat = LlmChat(
-                api_key=self.api_key,
+                api_key=api_key,
                 session_id=session_id,
                 system_message=system_message
             ).with_model("openai", "gpt-4o-mini")
 
             message = UserMessage(text=user_message)
             response = await chat.send_message(message)
-            
-            # Parse JSON response
-            try:
-                optimized_content = json.loads(response)
+            parser = IncrementalJSONParser()
+            parser.feed(response)
+            
+            # Parse JSON response, repairing truncated output
+            optimized_content = parser.result()
+            if fallback:
+                merged = {**fallback, **(optimized_content or {})}
+                for section in parser.repaired_sections:
+                    if fallback.get(section):
+                        merged[section] = fallback[section]
+                return merged
+            elif optimized_content:
                 return optimized_content
-            except json.JSONDecodeError:
+            else:
                 # Fallback structure
                 return {
                     "personal_info": {
@@ -247,39 +320,67 @@ class ResumeOptimizer:
             print(f"Error in content optimization: {str(e)}")
             raise Exception(f"Failed to optimize content: {str(e)}")
 
+# Compact rendering produces smaller PDF and DOCX files with the same layout
+COMPACT_RENDERING = os.environ.get("COMPACT_RENDERING", "true").lower() == "true"
+# Height of the empty Normal paragraph the standard DOCX uses as a spacer:
+# 11pt text at 1.15 line spacing plus 10pt spacing after
+DOCX_SPACER_POINTS = 23
+
 class DocumentGenerator:
     """Handles generation of optimized resume documents"""
     
     @staticmethod
-    def generate_pdf(content: Dict, output_path: str) -> str:
-        """Generate PDF from optimized content"""
+    @lru_cache(maxsize=1)
+    def _pdf_styles():
+        """Build the PDF stylesheet once per process; styles are read-only during builds"""
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.lib import colors
+        
+        styles = getSampleStyleSheet()
+        
+        # Title style
+        title_style = ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=20,
+            spaceAfter=30,
+            alignment=1,  # Center alignment
+            textColor=colors.black
+        )
+        
+        # Header style  
+        header_style = ParagraphStyle(
+            'CustomHeader',
+            parent=styles['Heading2'],
+            fontSize=14,
+            spaceAfter=12,
+            textColor=colors.darkblue
+        )
+        
+        return styles, title_style, header_style
+    
+    @staticmethod
+    def generate_pdf(content: Dict, output_path: str, compact: bool = COMPACT_RENDERING) -> str:
+        """Generate PDF from optimized content
+        
+        ``compact`` writes compressed page streams and leaves out the timestamp and
+        random document id. Only the standard, non-embedded PDF fonts are used.
+        """
+        from reportlab.lib.pagesizes import letter
+        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+        from xml.sax.saxutils import escape
+        
         try:
+            # invariant drops the creation timestamp and random document id, so
+            # identical content renders to identical bytes
+            compact_options = {"pageCompression": 1, "invariant": 1} if compact else {}
             doc = SimpleDocTemplate(output_path, pagesize=letter, 
                                   rightMargin=72, leftMargin=72, 
-                                  topMargin=72, bottomMargin=18)
+                                  topMargin=72, bottomMargin=18, **compact_options)
             
-            styles = getSampleStyleSheet()
+            styles, title_style, header_style = DocumentGenerator._pdf_styles()
             story = []
             
-            # Title style
-            title_style = ParagraphStyle(
-                'CustomTitle',
-                parent=styles['Heading1'],
-                fontSize=20,
-                spaceAfter=30,
-                alignment=1,  # Center alignment
-                textColor=colors.black
-            )
-            
-            # Header style  
-            header_style = ParagraphStyle(
-                'CustomHeader',
-                parent=styles['Heading2'],
-                fontSize=14,
-                spaceAfter=12,
-                textColor=colors.darkblue
-            )
-            
             # Personal Info
             personal = content.get('personal_info', {})
             story.append(Paragraph(personal.get('name', 'Name'), title_style))
@@ -350,6 +451,12 @@ class DocumentGenerator:
                 if skills.get('soft'):
                     story.append(Paragraph(f"<b>Soft Skills:</b> {', '.join(skills['soft'])}", styles['Normal']))
             
+            # Projects, awards and other sections
+            for section in content.get('additional_sections') or []:
+                story.append(Paragraph(escape(section.get('heading', '').upper()), header_style))
+                for item in section.get('items', []):
+                    story.append(Paragraph(escape(item), styles['Normal']))
+            
             doc.build(story)
             return output_path
             
@@ -357,10 +464,67 @@ class DocumentGenerator:
             raise Exception(f"Error generating PDF: {str(e)}")
     
     @staticmethod
-    def generate_docx(content: Dict, output_path: str) -> str:
-        """Generate DOCX from optimized content"""
+    def _add_docx_space(doc, compact: bool) -> None:
+        from docx.shared import Pt
+        
+        paragraphs = doc.paragraphs
+        if compact and paragraphs:
+            # Same gap as an empty paragraph, without the paragraph: Normal's own
+            # 10pt spacing after plus the spacer's height
+            paragraphs[-1].paragraph_format.space_after = Pt(10 + DOCX_SPACER_POINTS)
+        else:
+            doc.add_paragraph()
+    
+    @staticmethod
+    def _strip_docx_package(doc) -> None:
+        """Drop package parts and style definitions the resume never uses"""
+        from docx.oxml.ns import qn
+        
+        # Relationship types by their last path segment, which is stable across OOXML namespaces
+        unused_parts = {"stylesWithEffects", "webSettings", "customXml", "numbering", "thumbnail"}
+        for rels in (doc.part.rels, doc.part.package.rels):
+            for r_id in [r_id for r_id, rel in rels.items() if rel.reltype.rsplit("/", 1)[-1] in unused_parts]:
+                rels.pop(r_id)
+        
+        styles = doc.styles.element
+        for latent_styles in styles.findall(qn("w:latentStyles")):
+            styles.remove(latent_styles)
+        
+        # Keep default styles, styles the body references, and what they derive from
+        used = {
+            element.get(qn("w:val"))
+            for tag in ("w:pStyle", "w:rStyle", "w:tblStyle")
+            for element in doc.element.body.iter(qn(tag))
+        }
+        by_id = {style.get(qn("w:styleId")): style for style in styles.findall(qn("w:style"))}
+        pending = [style_id for style_id, style in by_id.items() if style.get(qn("w:default")) == "1"]
+        pending.extend(used)
+        keep = set()
+        while pending:
+            style_id = pending.pop()
+            if style_id in keep or style_id not in by_id:
+                continue
+            keep.add(style_id)
+            for tag in ("w:basedOn", "w:link", "w:next"):
+                reference = by_id[style_id].find(qn(tag))
+                if reference is not None:
+                    pending.append(reference.get(qn("w:val")))
+        for style_id, style in by_id.items():
+            if style_id not in keep:
+                styles.remove(style)
+    
+    @staticmethod
+    def generate_docx(content: Dict, output_path: str, compact: bool = COMPACT_RENDERING) -> str:
+        """Generate DOCX from optimized content
+        
+        ``compact`` replaces spacer paragraphs with paragraph spacing and leaves
+        out the template's unused parts, latent styles and style definitions.
+        """
+        import docx
+        from docx.enum.text import WD_ALIGN_PARAGRAPH
+        
         try:
-            doc = Document()
+            doc = docx.Document()
             
             # Personal Info
             personal = content.get('personal_info', {})
@@ -383,14 +547,14 @@ class DocumentGenerator:
                 contact_para = doc.add_paragraph(' | '.join(contact_info))
                 contact_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
             
-            doc.add_paragraph()  # Space
+            DocumentGenerator._add_docx_space(doc, compact)
             
             # Summary
             if content.get('summary'):
                 summary_heading = doc.add_paragraph()
                 summary_heading.add_run('PROFESSIONAL SUMMARY').bold = True
                 doc.add_paragraph(content['summary'])
-                doc.add_paragraph()  # Space
+                DocumentGenerator._add_docx_space(doc, compact)
             
             # Experience  
             if content.get('experience'):
@@ -417,7 +581,7 @@ class DocumentGenerator:
                         for achievement in exp['achievements']:
                             doc.add_paragraph(achievement)
                     
-                    doc.add_paragraph()  # Space between jobs
+                    DocumentGenerator._add_docx_space(doc, compact)
             
             # Education
             if content.get('education'):
@@ -431,7 +595,7 @@ class DocumentGenerator:
                     if edu.get('graduation'):
                         doc.add_paragraph(f"Graduated: {edu['graduation']}")
                     
-                    doc.add_paragraph()  # Space
+                    DocumentGenerator._add_docx_space(doc, compact)
             
             # Skills
             if content.get('skills'):
@@ -449,6 +613,16 @@ class DocumentGenerator:
                     soft_para.add_run('Soft Skills: ').bold = True
                     soft_para.add_run(', '.join(skills['soft']))
             
+            # Projects, awards and other sections
+            for section in content.get('additional_sections') or []:
+                DocumentGenerator._add_docx_space(doc, compact)
+                section_heading = doc.add_paragraph()
+                section_heading.add_run(section.get('heading', '').upper()).bold = True
+                for item in section.get('items', []):
+                    doc.add_paragraph(item)
+            
+            if compact:
+                DocumentGenerator._strip_docx_package(doc)
             doc.save(output_path)
             return output_path
             
@@ -460,6 +634,7 @@ class OptimizationService:
     
     def __init__(self):
         self.parser = ResumeParser()
+        self.segmenter = ResumeSegmenter()
         self.optimizer = ResumeOptimizer()
         self.generator = DocumentGenerator()
         
@@ -467,36 +642,40 @@ class OptimizationService:
         self.upload_dir = "/app/backend/uploads"
         os.makedirs(self.upload_dir, exist_ok=True)
     
-    async def process_resume(self, file_path: str, job_description: str) -> Dict:
-        """Complete resume optimization process"""
-        try:
-            # Extract text from uploaded file
-            file_extension = file_path.lower().split('.')[-1]
-            
-            if file_extension == 'pdf':
-                extracted_text = self.parser.extract_text_from_pdf(file_path)
-            elif file_extension in ['docx', 'doc']:
-                extracted_text = self.parser.extract_text_from_docx(file_path)
-            else:
-                raise ValueError("Unsupported file format. Please upload PDF or DOCX files only.")
-            
-            # Analyze resume and job description
-            analysis = await self.optimizer.analyze_resume_and_job(extracted_text, job_description)
-            
-            # Generate optimized content
-            optimized_content = await self.optimizer.optimize_resume_content(
-                extracted_text, job_description, analysis
-            )
-            
-            return {
-                "extracted_text": extracted_text[:1000] + "..." if len(extracted_text) > 1000 else extracted_text,
-                "analysis": analysis,
-                "optimized_content": optimized_content,
-                "status": "completed"
-            }
-            
-        except Exception as e:
-            raise Exception(f"Resume processing failed: {str(e)}")
+    def warm_up(self) -> None:
+        """Pay one-off startup costs before the first request does: imports, styles and pools"""
+        for module_name in HEAVY_MODULES:
+            try:
+                importlib.import_module(module_name)
+            except ImportError as e:
+                print(f"Warm-up could not import {module_name}: {str(e)}")
+        self.generator._pdf_styles()
+        pdf_extractor.start_pool()
+    
+    def shutdown(self) -> None:
+        pdf_extractor.shutdown()
+    
+    def parse_resume(self, file_path: str) -> Dict:
+        """Extract text and locally segmented structure from an uploaded file"""
+        file_extension = file_path.lower().split('.')[-1]
+        
+        if file_extension == 'pdf':
+            lines = self.parser.extract_lines_from_pdf(file_path)
+        elif file_extension in ['docx', 'doc']:
+            lines = self.parser.extract_lines_from_docx(file_path)
+        else:
+            raise ValueError("Unsupported file format. Please upload PDF or DOCX files only.")
+        
+        return {
+            "extracted_text": "\n".join(line.text for line in lines).strip(),
+            "structured_content": self.segmenter.segment(lines)
+        }
+    
+    def resume_prompt_text(self, parsed: Dict) -> str:
+        """Resume text for the LLM: the compact structure when segmentation succeeded"""
+        if self.segmenter.has_content(parsed["structured_content"]):
+            return self.segmenter.compact(parsed["structured_content"])
+        return parsed["extracted_text"]
     
     async def generate_documents(self, optimized_content: Dict, session_id: str) -> Dict[str, str]:
         """Generate PDF and DOCX files from optimized content"""
@@ -0,0 +1,246 @@
+import importlib.util
+import multiprocessing
+import os
+import statistics
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+from metrics import extraction_metrics
+from resume_segmenter import BULLET_RE, ResumeLine
+
+# PyMuPDF is optional; like the other PDF libraries it is only imported when used
+HAS_PYMUPDF = importlib.util.find_spec("fitz") is not None
+
+# Documents with at least this many pages are split across worker processes
+PARALLEL_PAGE_THRESHOLD = int(os.environ.get("PDF_PARALLEL_PAGE_THRESHOLD", "8"))
+# Up to this many pages the slower layout-aware pdfplumber backend is affordable
+LAYOUT_PAGE_LIMIT = int(os.environ.get("PDF_LAYOUT_PAGE_LIMIT", "4"))
+MAX_EXTRACTION_WORKERS = int(os.environ.get("PDF_EXTRACTION_WORKERS", str(min(os.cpu_count() or 1, 4))))
+
+
+def _text_to_lines(text: str) -> List[ResumeLine]:
+    return [
+        ResumeLine(text=line.strip(), bullet_hint=bool(BULLET_RE.match(line)))
+        for line in text.splitlines()
+        if line.strip()
+    ]
+
+
+class PdfBackend(ABC):
+    """Interface for PDF text extraction backends"""
+
+    name: str
+
+    @abstractmethod
+    def page_count(self, file_path: str) -> int:
+        """Number of pages in the document"""
+
+    @abstractmethod
+    def extract_pages(self, file_path: str, page_numbers: Sequence[int]) -> List[str]:
+        """Extract the text of each given page, empty for pages without a text layer"""
+
+    def extract_lines(self, file_path: str, page_numbers: Sequence[int]) -> List[ResumeLine]:
+        """Extract lines from the given pages; backends with layout data add hints"""
+        return [line for text in self.extract_pages(file_path, page_numbers) for line in _text_to_lines(text)]
+
+
+class PdfPlumberBackend(PdfBackend):
+    """Slow but layout-aware extraction with word positions and font data"""
+
+    name = "pdfplumber"
+
+    def page_count(self, file_path: str) -> int:
+        import pdfplumber
+
+        with pdfplumber.open(file_path) as pdf:
+            return len(pdf.pages)
+
+    def extract_pages(self, file_path: str, page_numbers: Sequence[int]) -> List[str]:
+        import pdfplumber
+
+        with pdfplumber.open(file_path) as pdf:
+            # Image-only pages have no text layer and return None
+            return [pdf.pages[number].extract_text() or "" for number in page_numbers]
+
+    def extract_lines(self, file_path: str, page_numbers: Sequence[int]) -> List[ResumeLine]:
+        import pdfplumber
+
+        with pdfplumber.open(file_path) as pdf:
+            page_words = [
+                pdf.pages[number].extract_words(extra_attrs=["size", "fontname"], use_text_flow=True)
+                for number in page_numbers
+            ]
+
+        sizes = [word["size"] for words in page_words for word in words]
+        body_size = statistics.median(sizes) if sizes else 0
+
+        lines = []
+        for words in page_words:
+            # Words sharing a baseline (within a few points) form one line
+            rows: List[List[Dict]] = []
+            for word in words:
+                if rows and abs(rows[-1][0]["top"] - word["top"]) <= 3:
+                    rows[-1].append(word)
+                else:
+                    rows.append([word])
+
+            for row in rows:
+                text = " ".join(word["text"] for word in row)
+                row_size = max(word["size"] for word in row)
+                all_bold = all("bold" in word["fontname"].lower() for word in row)
+                lines.append(ResumeLine(
+                    text=text,
+                    heading_hint=row_size >= body_size * 1.15 or (all_bold and len(row) <= 5),
+                    bullet_hint=bool(BULLET_RE.match(text)),
+                ))
+        return lines
+
+
+class PyPdfBackend(PdfBackend):
+    """Fast pure-Python extraction of the text layer without layout data"""
+
+    name = "pypdf"
+
+    def page_count(self, file_path: str) -> int:
+        from PyPDF2 import PdfReader
+
+        return len(PdfReader(file_path).pages)
+
+    def extract_pages(self, file_path: str, page_numbers: Sequence[int]) -> List[str]:
+        from PyPDF2 import PdfReader
+
+        reader = PdfReader(file_path)
+        return [reader.pages[number].extract_text() or "" for number in page_numbers]
+
+
+class PyMuPdfBackend(PdfBackend):
+    """Native MuPDF extraction, the fastest option when PyMuPDF is installed"""
+
+    name = "pymupdf"
+    _BOLD_FLAG = 16
+
+    def page_count(self, file_path: str) -> int:
+        import fitz
+
+        with fitz.open(file_path) as pdf:
+            return pdf.page_count
+
+    def extract_pages(self, file_path: str, page_numbers: Sequence[int]) -> List[str]:
+        import fitz
+
+        with fitz.open(file_path) as pdf:
+            return [pdf[number].get_text() or "" for number in page_numbers]
+
+    def extract_lines(self, file_path: str, page_numbers: Sequence[int]) -> List[ResumeLine]:
+        import fitz
+
+        with fitz.open(file_path) as pdf:
+            page_lines = []
+            for number in page_numbers:
+                for block in pdf[number].get_text("dict")["blocks"]:
+                    for line in block.get("lines", []):
+                        spans = [span for span in line["spans"] if span["text"].strip()]
+                        if spans:
+                            page_lines.append(spans)
+
+        sizes = [span["size"] for spans in page_lines for span in spans]
+        body_size = statistics.median(sizes) if sizes else 0
+
+        lines = []
+        for spans in page_lines:
+            text = " ".join(span["text"].strip() for span in spans)
+            all_bold = all(span["flags"] & self._BOLD_FLAG for span in spans)
+            lines.append(ResumeLine(
+                text=text,
+                heading_hint=max(span["size"] for span in spans) >= body_size * 1.15
+                or (all_bold and len(text.split()) <= 5),
+                bullet_hint=bool(BULLET_RE.match(text)),
+            ))
+        return lines
+
+
+BACKENDS: Dict[str, PdfBackend] = {
+    backend.name: backend
+    for backend in (PdfPlumberBackend(), PyPdfBackend(), PyMuPdfBackend() if HAS_PYMUPDF else None)
+    if backend is not None
+}
+
+
+def _extract_lines_chunk(backend_name: str, file_path: str, page_numbers: List[int]) -> List[ResumeLine]:
+    # Runs in a worker process; backends are looked up by name to stay picklable
+    return BACKENDS[backend_name].extract_lines(file_path, page_numbers)
+
+
+class PdfExtractor:
+    """Chooses an extraction backend per document and parallelizes long documents"""
+
+    def __init__(self, backend: Optional[str] = None, max_workers: int = MAX_EXTRACTION_WORKERS):
+        if backend is not None and backend not in BACKENDS:
+            raise ValueError(f"Unknown PDF backend '{backend}'. Available: {', '.join(BACKENDS)}")
+        self.backend = backend
+        self.max_workers = max_workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def select_backend(self, page_count: int) -> PdfBackend:
+        """Pick a backend from cheap document heuristics"""
+        if self.backend:
+            return BACKENDS[self.backend]
+        if "pymupdf" in BACKENDS:
+            return BACKENDS["pymupdf"]
+        # Typical resumes are short enough that font-based heading hints are worth the cost
+        if page_count <= LAYOUT_PAGE_LIMIT:
+            return BACKENDS["pdfplumber"]
+        return BACKENDS["pypdf"]
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Forking a process that runs the event loop and driver threads can
+            # deadlock the child on a lock one of those threads held
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    def start_pool(self) -> None:
+        """Spawn the worker processes now instead of on the first long document"""
+        if self.max_workers > 1:
+            pool = self._get_pool()
+            for future in [pool.submit(os.getpid) for _ in range(self.max_workers)]:
+                future.result()
+
+    def extract_lines(self, file_path: str) -> List[ResumeLine]:
+        """Extract lines from every page of the document"""
+        start = time.perf_counter()
+        # Reading the page tree with PyPDF2 is cheap compared with any text extraction
+        page_count = BACKENDS["pypdf"].page_count(file_path)
+        backend = self.select_backend(page_count)
+        pages = list(range(page_count))
+
+        if page_count >= PARALLEL_PAGE_THRESHOLD and self.max_workers > 1:
+            chunk_size = -(-page_count // self.max_workers)
+            chunks = [pages[i:i + chunk_size] for i in range(0, page_count, chunk_size)]
+            pool = self._get_pool()
+            futures = [pool.submit(_extract_lines_chunk, backend.name, file_path, chunk) for chunk in chunks]
+            lines = [line for future in futures for line in future.result()]
+            metric_name = f"{backend.name}_parallel"
+        else:
+            lines = backend.extract_lines(file_path, pages)
+            metric_name = backend.name
+
+        extraction_metrics.record(
+            metric_name,
+            time.perf_counter() - start,
+            pages=page_count,
+            bytes_processed=os.path.getsize(file_path),
+        )
+        return lines
+
+    def extract_text(self, file_path: str) -> str:
+        return "\n".join(line.text for line in self.extract_lines(file_path)).strip()
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,46 @@
+import asyncio
+import hashlib
+from typing import Awaitable, Callable, Dict, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+def upload_fingerprint(file_content: bytes, job_description_hash: str) -> str:
+    """Identify a submission by its file bytes and normalized job description"""
+    digest = hashlib.sha256(file_content)
+    digest.update(b"\0")
+    digest.update(job_description_hash.encode("ascii"))
+    return digest.hexdigest()
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time; concurrent callers share its result"""
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Future] = {}
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """Return ``(result, shared)``; ``shared`` is True for callers that joined another call"""
+        existing = self._calls.get(key)
+        if existing is not None:
+            # Shield so a cancelled follower does not cancel the leader's work
+            return await asyncio.shield(existing), True
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await fn()
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception retrieved when no follower is waiting on it
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            self._calls.pop(key, None)
@@ -0,0 +1,328 @@
+import json
+import re
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+
+class ResumeLine(NamedTuple):
+    """A single line of resume text with optional layout hints from the source file"""
+    text: str
+    heading_hint: bool = False
+    bullet_hint: bool = False
+
+
+_SECTION_PATTERNS = {
+    "summary": r"(?:professional\s+|career\s+|executive\s+)?(?:summary|profile)|objective|about(?:\s+me)?",
+    "experience": r"(?:professional\s+|work\s+|relevant\s+)?experience|employment(?:\s+history)?|(?:work|career)\s+history",
+    "education": r"education(?:al\s+background)?|academic\s+(?:background|history)",
+    "skills": r"(?:technical\s+|core\s+|key\s+)?(?:skills|competencies)(?:\s*(?:&|and)\s*\w+)?|technologies|tech\s+stack",
+    "certifications": r"certifications?|licen[cs]es?(?:\s*(?:&|and)\s*certifications?)?",
+    "other": r"projects?|awards?|honou?rs|publications|volunteer(?:ing)?(?:\s+experience)?|interests|languages|references",
+}
+
+HEADING_RE = re.compile(
+    r"^\s*(?:"
+    + "|".join(f"(?P<{name}>{pattern})" for name, pattern in _SECTION_PATTERNS.items())
+    + r")\s*:?\s*$",
+    re.IGNORECASE,
+)
+
+_MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+_DATE = rf"(?:{_MONTH}\s+\d{{4}}|\d{{1,2}}/\d{{4}}|\d{{4}})"
+DATE_RANGE_RE = re.compile(
+    rf"(?P<start>{_DATE})\s*(?:-|–|—|to)\s*(?P<end>{_DATE}|present|current|now)",
+    re.IGNORECASE,
+)
+DATE_RE = re.compile(rf"\b{_DATE}\b", re.IGNORECASE)
+
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+PHONE_RE = re.compile(r"(?:\+?\d{1,3}[\s.-]?)?(?:\(\d{3}\)|\d{3})[\s.-]?\d{3}[\s.-]?\d{4}")
+LINKEDIN_RE = re.compile(r"(?:https?://)?(?:[a-z]{2,3}\.)?linkedin\.com/in/[\w%-]+/?", re.IGNORECASE)
+URL_RE = re.compile(r"(?:https?://|www\.)[^\s|,]+|\b[\w-]+\.(?:com|io|dev|me|net|org)(?:/[^\s|,]*)?\b", re.IGNORECASE)
+LOCATION_RE = re.compile(r"\b[A-Z][a-zA-Z.\s]+,\s*(?:[A-Z]{2}|[A-Z][a-z]+)\b")
+GPA_RE = re.compile(r"\bGPA\s*:?\s*(?P<gpa>\d\.\d{1,2}(?:\s*/\s*\d\.\d{1,2})?)", re.IGNORECASE)
+
+BULLET_RE = re.compile(r"^\s*(?:\(cid:\d+\)|[•●▪◦‣∙·○■□➢►*\-–—]|\d{1,2}[.)])\s+")
+FIELD_SPLIT_RE = re.compile(r"\s*(?:\||•|·|\s[-–—]\s|\sat\s)\s*")
+SKILL_SPLIT_RE = re.compile(r"\s*(?:,|;|\||•|·)\s*")
+SKILL_LABEL_RE = re.compile(r"^\s*(?P<label>[A-Za-z &/]{2,40}):\s*")
+
+INSTITUTION_RE = re.compile(r"\b(?:university|college|institute|school|academy|polytechnic)\b", re.IGNORECASE)
+DEGREE_RE = re.compile(
+    r"\b(?:bachelor|master|doctor|associate|diploma|ph\.?\s?d|mba|b\.?\s?(?:s|a|sc|tech|e|eng)|m\.?\s?(?:s|a|sc|tech|eng))\b\.?",
+    re.IGNORECASE,
+)
+
+SOFT_SKILLS = frozenset({
+    "communication", "leadership", "teamwork", "collaboration", "problem solving", "problem-solving",
+    "time management", "adaptability", "critical thinking", "creativity", "mentoring", "negotiation",
+    "presentation", "public speaking", "attention to detail", "organization", "interpersonal skills",
+    "stakeholder management", "conflict resolution", "decision making", "project management",
+})
+
+_MAX_HEADING_LENGTH = 48
+
+
+class ResumeSegmenter:
+    """Splits extracted resume lines into the structured resume schema without the LLM"""
+
+    def segment(self, lines: List[ResumeLine]) -> Dict:
+        """Return resume content in the same schema as ``optimize_resume_content``"""
+        sections, additional = self._split_sections(lines)
+        header = sections.pop("header", [])
+
+        personal_info = self._extract_personal_info(header + sections.get("summary", [])[:2])
+        summary_lines = sections.get("summary") or self._summary_from_header(header, personal_info)
+
+        return {
+            "personal_info": personal_info,
+            "summary": " ".join(line.text.strip() for line in summary_lines if not self._is_contact_line(line.text)),
+            "experience": self._extract_experience(sections.get("experience", [])),
+            "education": self._extract_education(sections.get("education", [])),
+            "skills": self._extract_skills(sections.get("skills", [])),
+            "certifications": self._extract_certifications(sections.get("certifications", [])),
+            # Projects, awards and other unclassified sections are kept verbatim
+            "additional_sections": additional,
+        }
+
+    @staticmethod
+    def has_content(structured: Dict) -> bool:
+        """Whether segmentation found enough structure to stand in for the raw text"""
+        return bool(structured.get("experience") or structured.get("education")) and bool(
+            structured.get("personal_info", {}).get("name") or structured.get("summary")
+        )
+
+    @staticmethod
+    def compact(structured: Dict) -> str:
+        """Serialize structured content for a prompt, dropping empty fields"""
+
+        def prune(value):
+            if isinstance(value, dict):
+                pruned = {key: prune(item) for key, item in value.items()}
+                return {key: item for key, item in pruned.items() if item not in ("", [], {}, None)}
+            if isinstance(value, list):
+                return [item for item in (prune(item) for item in value) if item not in ("", [], {}, None)]
+            return value
+
+        return json.dumps(prune(structured), separators=(",", ":"), ensure_ascii=False)
+
+    def _split_sections(self, lines: List[ResumeLine]) -> Tuple[Dict[str, List[ResumeLine]], List[Dict]]:
+        """Group lines by known section, plus each unclassified section as heading and items"""
+        sections: Dict[str, List[ResumeLine]] = {"header": []}
+        additional: List[Dict] = []
+        current: List = sections["header"]
+        for line in lines:
+            text = line.text.strip()
+            if not text:
+                continue
+            heading = self._match_heading(line)
+            if heading == "other":
+                additional.append({"heading": text.rstrip(":").strip(), "items": []})
+                current = additional[-1]["items"]
+                continue
+            if heading:
+                current = sections.setdefault(heading, [])
+                continue
+            current.append(line)
+        for section in additional:
+            section["items"] = [BULLET_RE.sub("", line.text).strip() for line in section["items"]]
+        return sections, [section for section in additional if section["items"]]
+
+    @staticmethod
+    def _match_heading(line: ResumeLine) -> Optional[str]:
+        text = line.text.strip()
+        if len(text) > _MAX_HEADING_LENGTH or BULLET_RE.match(text):
+            return None
+        match = HEADING_RE.match(text)
+        if match:
+            return match.lastgroup
+        if line.heading_hint and text.isupper() and not EMAIL_RE.search(text):
+            return "other"
+        return None
+
+    @staticmethod
+    def _is_contact_line(text: str) -> bool:
+        return bool(EMAIL_RE.search(text) or PHONE_RE.search(text) or LINKEDIN_RE.search(text))
+
+    def _extract_personal_info(self, lines: List[ResumeLine]) -> Dict[str, str]:
+        info = {"name": "", "email": "", "phone": "", "location": "", "linkedin": "", "website": ""}
+        for line in lines:
+            text = line.text.strip()
+            for pattern, field in ((EMAIL_RE, "email"), (PHONE_RE, "phone"), (LINKEDIN_RE, "linkedin")):
+                if not info[field]:
+                    match = pattern.search(text)
+                    if match:
+                        info[field] = match.group(0)
+
+            remainder = LINKEDIN_RE.sub("", EMAIL_RE.sub("", text))
+            if not info["website"]:
+                match = URL_RE.search(remainder)
+                if match:
+                    info["website"] = match.group(0)
+
+            for part in FIELD_SPLIT_RE.split(PHONE_RE.sub("", remainder)):
+                part = part.strip(" ,")
+                if not part or URL_RE.search(part):
+                    continue
+                if not info["location"] and LOCATION_RE.fullmatch(part):
+                    info["location"] = part
+                elif not info["name"] and self._looks_like_name(part):
+                    info["name"] = part
+        return info
+
+    @staticmethod
+    def _looks_like_name(text: str) -> bool:
+        words = text.split()
+        return 2 <= len(words) <= 4 and all(word[0].isupper() and word.replace(".", "").replace("-", "").isalpha() for word in words)
+
+    def _summary_from_header(self, header: List[ResumeLine], personal_info: Dict[str, str]) -> List[ResumeLine]:
+        # Without a summary heading, long prose lines under the contact block are the summary
+        return [
+            line for line in header
+            if len(line.text.split()) >= 8
+            and not self._is_contact_line(line.text)
+            and line.text.strip() != personal_info.get("name")
+        ]
+
+    def _group_entries(self, lines: List[ResumeLine]) -> List[Dict[str, List[str]]]:
+        """Group section lines into entries of header lines followed by bullet lines"""
+        entries: List[Dict[str, List[str]]] = []
+        current: Optional[Dict[str, List[str]]] = None
+        for line in lines:
+            text = line.text.strip()
+            is_bullet = line.bullet_hint or bool(BULLET_RE.match(text))
+            if is_bullet:
+                if current is None:
+                    current = {"header": [], "bullets": []}
+                    entries.append(current)
+                current["bullets"].append(BULLET_RE.sub("", text).strip())
+                continue
+
+            starts_entry = (
+                current is None
+                or bool(current["bullets"]) and not text[:1].islower()
+                or bool(DATE_RANGE_RE.search(text)) and any(DATE_RANGE_RE.search(h) for h in current["header"])
+            )
+            if current is not None and current["bullets"] and text[:1].islower():
+                # Wrapped continuation of the previous bullet
+                current["bullets"][-1] += " " + text
+            elif starts_entry:
+                current = {"header": [text], "bullets": []}
+                entries.append(current)
+            else:
+                current["header"].append(text)
+        return entries
+
+    @staticmethod
+    def _header_fields(header: List[str]) -> Dict[str, str]:
+        fields = {"start_date": "", "end_date": "", "location": "", "parts": []}
+        for text in header:
+            match = DATE_RANGE_RE.search(text)
+            if match and not fields["start_date"]:
+                fields["start_date"] = match.group("start")
+                fields["end_date"] = match.group("end")
+                text = text[:match.start()] + text[match.end():]
+            for part in FIELD_SPLIT_RE.split(text):
+                part = part.strip(" ,()")
+                if not part:
+                    continue
+                if not fields["location"] and LOCATION_RE.fullmatch(part):
+                    fields["location"] = part
+                else:
+                    fields["parts"].append(part)
+        return fields
+
+    def _extract_experience(self, lines: List[ResumeLine]) -> List[Dict]:
+        experience = []
+        for entry in self._group_entries(lines):
+            fields = self._header_fields(entry["header"])
+            parts = fields["parts"]
+            experience.append({
+                "company": parts[1] if len(parts) > 1 else "",
+                "position": parts[0] if parts else "",
+                "location": fields["location"],
+                "start_date": fields["start_date"],
+                "end_date": fields["end_date"],
+                "achievements": [f"• {bullet}" for bullet in entry["bullets"]],
+            })
+        return experience
+
+    def _extract_education(self, lines: List[ResumeLine]) -> List[Dict]:
+        education = []
+        for entry in self._group_entries(lines):
+            header = entry["header"] + entry["bullets"]
+            fields = self._header_fields(header)
+            joined = " ".join(header)
+
+            parts = []
+            for part in fields["parts"]:
+                # "B.S. Computer Science, University of Texas" names both on one line
+                if INSTITUTION_RE.search(part) and DEGREE_RE.search(part) and "," in part:
+                    parts.extend(piece.strip() for piece in part.split(",") if piece.strip())
+                else:
+                    parts.append(part)
+            fields["parts"] = parts
+
+            institution = next((part for part in fields["parts"] if INSTITUTION_RE.search(part)), "")
+            degree = next((part for part in fields["parts"] if DEGREE_RE.search(part) and part != institution), "")
+            remaining = [part for part in fields["parts"] if part not in (institution, degree) and not GPA_RE.search(part)]
+            if not institution and remaining:
+                institution = remaining.pop(0)
+            if not degree and remaining:
+                degree = remaining.pop(0)
+
+            graduation = fields["end_date"]
+            if not graduation:
+                dates = DATE_RE.findall(joined)
+                graduation = dates[-1] if dates else ""
+                degree = DATE_RE.sub("", degree)
+                institution = DATE_RE.sub("", institution)
+
+            gpa = GPA_RE.search(joined)
+            education.append({
+                "institution": self._clean_field(institution),
+                "degree": self._clean_field(degree),
+                "location": fields["location"],
+                "graduation": graduation,
+                "gpa": gpa.group("gpa") if gpa else "",
+            })
+        return education
+
+    @staticmethod
+    def _clean_field(text: str) -> str:
+        return re.sub(r"\(\s*\)", "", GPA_RE.sub("", text)).strip(" ,-–—")
+
+    @staticmethod
+    def _extract_skills(lines: List[ResumeLine]) -> Dict[str, List[str]]:
+        skills = {"technical": [], "soft": []}
+        seen = set()
+        for line in lines:
+            text = BULLET_RE.sub("", line.text.strip())
+            label_match = SKILL_LABEL_RE.match(text)
+            label = label_match.group("label").lower() if label_match else ""
+            if label_match:
+                text = text[label_match.end():]
+            for skill in SKILL_SPLIT_RE.split(text):
+                skill = skill.strip(" .")
+                if not skill or skill.lower() in seen or len(skill) > 60:
+                    continue
+                seen.add(skill.lower())
+                is_soft = "soft" in label or "interpersonal" in label or skill.lower() in SOFT_SKILLS
+                skills["soft" if is_soft else "technical"].append(skill)
+        return skills
+
+    @staticmethod
+    def _extract_certifications(lines: List[ResumeLine]) -> List[Dict[str, str]]:
+        certifications = []
+        for line in lines:
+            text = BULLET_RE.sub("", line.text.strip())
+            dates = DATE_RE.findall(text)
+            text = DATE_RE.sub("", text).strip(" ,-–—()|")
+            parts = [part.strip(" ,()") for part in FIELD_SPLIT_RE.split(text) if part.strip(" ,()")]
+            if not parts:
+                continue
+            certifications.append({
+                "name": parts[0],
+                "issuer": parts[1] if len(parts) > 1 else "",
+                "date": dates[-1] if dates else "",
+            })
+        return certifications
@@ -1,4 +1,6 @@
-from fastapi import FastAPI, APIRouter
+from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi.responses import JSONResponse
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
@@ -11,6 +13,7 @@ import uuid
 from datetime import datetime
 
 # Import optimization routes
+import optimization_routes
 from optimization_routes import router as optimization_router
 
 ROOT_DIR = Path(__file__).parent
@@ -21,8 +24,16 @@ mongo_url = os.environ['MONGO_URL']
 client = AsyncIOMotorClient(mongo_url)
 db = client[os.environ['DB_NAME']]
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await optimization_routes.startup()
+    yield
+    await optimization_routes.shutdown()
+    bulk_exporter.shutdown()
+    client.close()
+
 # Create the main app without a prefix
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -42,6 +53,23 @@ class StatusCheckCreate(BaseModel):
 async def root():
     return {"message": "Hello World"}
 
+@api_router.get("/health/live")
+async def liveness():
+    """The process is up and serving requests"""
+    return {"status": "alive"}
+
+@api_router.get("/health/ready")
+async def readiness():
+    """The service is built and, if enabled, warmed up"""
+    state = {
+        "started": optimization_routes.service_state["started"],
+        "warmed_up": optimization_routes.service_state["warmed_up"],
+        "warm_up_failed": optimization_routes.service_state["warm_up_failed"],
+    }
+    if not optimization_routes.is_ready():
+        return JSONResponse(status_code=503, content={"status": "starting", **state})
+    return {"status": "ready", **state}
+
 @api_router.post("/status", response_model=StatusCheck)
 async def create_status_check(input: StatusCheckCreate):
     status_dict = input.dict()
@@ -55,8 +83,14 @@ async def get_status_checks():
     return [StatusCheck(**status_check) for status_check in status_checks]
 
 # Resume PDF Export
-from fastapi.responses import FileResponse
+from fastapi import Header, Request
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
 from optimization_service import DocumentGenerator
+from admission import admission_controller, client_identity
+from bulk_export import EXPORT_FORMATS, bulk_exporter, export_filename, resume_data_to_content
+from typing import Optional, Union
 import json
 
 class ResumeExportRequest(BaseModel):
@@ -64,8 +98,14 @@ class ResumeExportRequest(BaseModel):
     template_id: str
 
 @api_router.post("/export/pdf")
-async def export_resume_pdf(request: ResumeExportRequest):
+async def export_resume_pdf(request: ResumeExportRequest, http_request: Request,
+                            x_priority: Optional[str] = Header(None)):
     """Export resume data as PDF"""
+    client_id = client_identity(http_request)
+    ticket = admission_controller.admit(client_id, admission_controller.lane_for(client_id, x_priority))
+    return await admission_controller.run(ticket, _export_resume_pdf, request)
+
+async def _export_resume_pdf(request: ResumeExportRequest):
     try:
         # Create uploads directory if it doesn't exist
         upload_dir = "/app/backend/uploads"
@@ -76,47 +116,11 @@ async def export_resume_pdf(request: ResumeExportRequest):
         pdf_path = os.path.join(upload_dir, f"resume_export_{export_id}.pdf")
         
         # Convert resume data to the format expected by DocumentGenerator
-        optimized_content = {
-            "personal_info": {
-                "name": request.resume_data.get("personalInfo", {}).get("fullName", ""),
-                "email": request.resume_data.get("personalInfo", {}).get("email", ""),
-                "phone": request.resume_data.get("personalInfo", {}).get("phone", ""),
-                "location": request.resume_data.get("personalInfo", {}).get("location", ""),
-                "linkedin": request.resume_data.get("personalInfo", {}).get("linkedin", ""),
-                "website": request.resume_data.get("personalInfo", {}).get("website", "")
-            },
-            "summary": request.resume_data.get("summary", ""),
-            "experience": [
-                {
-                    "company": exp.get("company", ""),
-                    "position": exp.get("position", ""),
-                    "location": exp.get("location", ""),
-                    "start_date": exp.get("startDate", ""),
-                    "end_date": exp.get("endDate", ""),
-                    "achievements": exp.get("description", []) if isinstance(exp.get("description"), list) else exp.get("description", "").split('\n') if exp.get("description") else []
-                }
-                for exp in request.resume_data.get("experience", [])
-            ],
-            "education": [
-                {
-                    "institution": edu.get("institution", ""),
-                    "degree": edu.get("degree", ""),
-                    "location": edu.get("location", ""),
-                    "graduation": f"{edu.get('startDate', '')} - {edu.get('endDate', '')}" if edu.get('startDate') and edu.get('endDate') else "",
-                    "gpa": edu.get("gpa", "")
-                }
-                for edu in request.resume_data.get("education", [])
-            ],
-            "skills": {
-                "technical": request.resume_data.get("skills", {}).get("technical", []),
-                "soft": request.resume_data.get("skills", {}).get("soft", [])
-            },
-            "certifications": request.resume_data.get("certifications", [])
-        }
+        optimized_content = resume_data_to_content(request.resume_data)
         
         # Generate PDF using the DocumentGenerator
         generator = DocumentGenerator()
-        generator.generate_pdf(optimized_content, pdf_path)
+        await run_in_threadpool(generator.generate_pdf, optimized_content, pdf_path)
         
         # Return file for download
         return FileResponse(
@@ -129,6 +133,117 @@ async def export_resume_pdf(request: ResumeExportRequest):
         logger.error(f"PDF export error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"PDF export failed: {str(e)}")
 
+BULK_EXPORT_MAX_ITEMS = 1000
+
+class PersonalInfoData(BaseModel):
+    fullName: str = ""
+    email: str = ""
+    phone: str = ""
+    location: str = ""
+    linkedin: str = ""
+    website: str = ""
+
+class ExperienceData(BaseModel):
+    company: str = ""
+    position: str = ""
+    location: str = ""
+    startDate: str = ""
+    endDate: str = ""
+    description: Union[List[str], str] = []
+
+class EducationData(BaseModel):
+    institution: str = ""
+    degree: str = ""
+    location: str = ""
+    startDate: str = ""
+    endDate: str = ""
+    gpa: str = ""
+
+class SkillsData(BaseModel):
+    technical: List[str] = []
+    soft: List[str] = []
+
+class ResumeData(BaseModel):
+    """Editor resume data, validated before a bulk export starts streaming"""
+    personalInfo: PersonalInfoData = PersonalInfoData()
+    summary: str = ""
+    experience: List[ExperienceData] = []
+    education: List[EducationData] = []
+    skills: SkillsData = SkillsData()
+    certifications: List[Union[dict, str]] = []
+
+class BulkExportItem(BaseModel):
+    resume_data: Optional[ResumeData] = None
+    session_id: Optional[str] = None
+    name: Optional[str] = None
+
+class BulkExportRequest(BaseModel):
+    items: List[BulkExportItem]
+    formats: List[str] = ["pdf"]
+
+@api_router.post("/export/bulk")
+async def export_resumes_bulk(request: BulkExportRequest, http_request: Request):
+    """Render many resumes and stream them back as a ZIP while they are produced
+    
+    Each item carries either editor ``resume_data`` or the ``session_id`` of a
+    completed optimization. Items that cannot be rendered get an ``.error.txt``
+    entry in the archive instead of failing the whole export.
+    """
+    if not request.items:
+        raise HTTPException(status_code=400, detail="No items to export")
+    if len(request.items) > BULK_EXPORT_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_EXPORT_MAX_ITEMS} items per export")
+    formats = list(dict.fromkeys(request.formats))
+    if not formats or any(file_format not in EXPORT_FORMATS for file_format in formats):
+        raise HTTPException(status_code=400, detail="Invalid formats. Use 'pdf' and/or 'docx'")
+    for item in request.items:
+        if (item.resume_data is None) == (item.session_id is None):
+            raise HTTPException(status_code=400, detail="Each item needs exactly one of resume_data or session_id")
+    
+    # Bulk exports always queue behind interactive work
+    ticket = admission_controller.admit(client_identity(http_request), "bulk")
+    
+    async def export_items():
+        for index, item in enumerate(request.items):
+            base_name = export_filename(index, None, item.name or item.session_id or "resume")
+            try:
+                if item.resume_data is not None:
+                    content = resume_data_to_content(item.resume_data.dict())
+                    yield export_filename(index, content, item.name or "resume"), content, None
+                    continue
+                
+                session = await optimization_routes.session_store.get(
+                    item.session_id, ["status", "optimized_content"]
+                )
+            except Exception as e:
+                # The response has already started, so failures become error entries
+                logger.error(f"Bulk export item {index} failed: {str(e)}")
+                yield base_name, None, f"Could not load item: {str(e)}"
+                continue
+            
+            if not session or not session.get("optimized_content"):
+                yield base_name, None, f"Session {item.session_id} not found or not optimized"
+            else:
+                content = session["optimized_content"]
+                yield export_filename(index, content, item.name or item.session_id), content, None
+    
+    async def stream():
+        try:
+            await admission_controller.acquire_slot(ticket)
+            async for chunk in bulk_exporter.stream_zip(export_items(), formats):
+                yield chunk
+        finally:
+            ticket.release()
+    
+    return StreamingResponse(
+        stream(),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="resumes_{uuid.uuid4().hex[:8]}.zip"'},
+        # Also runs when the client disconnects before the stream starts, where the
+        # generator's finally never does; releasing twice is a no-op
+        background=BackgroundTask(ticket.release)
+    )
+
 # Include the optimization router
 app.include_router(optimization_router)
 
@@ -148,8 +263,4 @@ logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
-logger = logging.getLogger(__name__)
-
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+logger = logging.getLogger(__name__)
\ No newline at end of file
@@ -0,0 +1,215 @@
+import glob
+import json
+import logging
+import os
+import time
+import zlib
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import bson
+from pymongo.errors import OperationFailure
+
+# Large fields are stored zlib-compressed; they are never queried, only read back whole
+COMPRESSED_FIELDS = frozenset({"extracted_text", "analysis", "optimized_content", "preview_content", "results_json"})
+COMPRESSION_MIN_BYTES = int(os.environ.get("SESSION_COMPRESSION_MIN_BYTES", "512"))
+COMPRESSION_LEVEL = 6
+# Hard cap on the encoded size of a session document, summed across its writes
+SESSION_MAX_BYTES = int(os.environ.get("SESSION_MAX_BYTES", str(1024 * 1024)))
+
+# Sessions untouched for this long expire together with their files
+SESSION_TTL_SECONDS = int(os.environ.get("SESSION_TTL_SECONDS", str(7 * 24 * 3600)))
+# The sweeper removes expired sessions and their files first; the TTL index is a
+# backstop that deletes documents the sweeper has not reached within this grace period
+SESSION_TTL_GRACE_SECONDS = int(os.environ.get("SESSION_TTL_GRACE_SECONDS", "3600"))
+
+logger = logging.getLogger(__name__)
+
+_TEXT_TAG = b"t"
+_JSON_TAG = b"j"
+
+
+class SessionTooLarge(ValueError):
+    """A write would grow a session beyond SESSION_MAX_BYTES even after compression"""
+
+
+def encode_field(value: object) -> object:
+    """Compress a text or JSON value into tagged bytes, leaving small values as they are"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        tag, raw = _TEXT_TAG, value.encode("utf-8")
+    else:
+        tag, raw = _JSON_TAG, json.dumps(value, separators=(",", ":"), default=str).encode("utf-8")
+    if len(raw) < COMPRESSION_MIN_BYTES:
+        return value
+    return bson.Binary(tag + zlib.compress(raw, COMPRESSION_LEVEL))
+
+
+def decode_field(value: object) -> object:
+    if not isinstance(value, bytes):
+        # Plain values: small fields and sessions stored before compression
+        return value
+    raw = zlib.decompress(value[1:]).decode("utf-8")
+    return raw if value[:1] == _TEXT_TAG else json.loads(raw)
+
+
+def decode_session(document: Optional[Dict]) -> Optional[Dict]:
+    if document is None:
+        return None
+    for field in COMPRESSED_FIELDS.intersection(document):
+        document[field] = decode_field(document[field])
+    return document
+
+
+class SessionStore:
+    """Data access for optimization sessions: compression, size cap and expiry
+
+    All reads and writes of ``optimization_sessions`` go through this class, so
+    callers always see plain values and every write refreshes ``expires_at``.
+    The encoded size of each large field is kept in ``field_bytes``, so the size
+    cap covers everything a session accumulates, not just a single write.
+    """
+
+    def __init__(self, collection, ttl_seconds: int = SESSION_TTL_SECONDS,
+                 max_bytes: int = SESSION_MAX_BYTES):
+        self.collection = collection
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.max_bytes = max_bytes
+
+    async def ensure_indexes(self) -> None:
+        await self.collection.create_index("id", unique=True)
+        await self.collection.create_index([("upload_fingerprint", 1), ("created_at", -1)])
+        # Idempotency keys are unique per client; sessions without a key are not indexed
+        await self.collection.create_index(
+            [("client_id", 1), ("idempotency_key", 1)],
+            unique=True,
+            partialFilterExpression={"client_id": {"$type": "string"}, "idempotency_key": {"$type": "string"}}
+        )
+        try:
+            # Superseded by the per-client index above
+            await self.collection.drop_index("idempotency_key_1")
+        except OperationFailure:
+            pass
+        # Keyset pagination for /sessions, optionally filtered by status
+        await self.collection.create_index([("created_at", -1), ("id", -1)])
+        await self.collection.create_index([("status", 1), ("created_at", -1), ("id", -1)])
+        # Candidate index catch-up scans completed sessions by update time
+        await self.collection.create_index([("status", 1), ("updated_at", 1)])
+        await self.collection.create_index("expires_at", expireAfterSeconds=SESSION_TTL_GRACE_SECONDS)
+
+    def _encode(self, fields: Dict, stored_bytes: Optional[Dict[str, int]] = None) -> Tuple[Dict, Dict[str, int]]:
+        """Compress large fields and check the size cap; returns the encoded fields and their sizes
+
+        ``stored_bytes`` holds the sizes of large fields already stored; fields
+        written now replace their stored size.
+        """
+        encoded = {
+            key: encode_field(value) if key in COMPRESSED_FIELDS else value
+            for key, value in fields.items()
+        }
+        field_bytes = {
+            key: len(bson.encode({key: value})) for key, value in encoded.items() if key in COMPRESSED_FIELDS
+        }
+        other_fields = {key: value for key, value in encoded.items() if key not in COMPRESSED_FIELDS}
+        size = sum({**(stored_bytes or {}), **field_bytes}.values()) + len(bson.encode(other_fields))
+        if size > self.max_bytes:
+            raise SessionTooLarge(
+                f"Session data is too large to store ({size} bytes, limit {self.max_bytes})"
+            )
+        encoded["expires_at"] = datetime.utcnow() + self.ttl
+        return encoded, field_bytes
+
+    async def insert(self, session: Dict) -> None:
+        encoded, field_bytes = self._encode(session)
+        await self.collection.insert_one({**encoded, "field_bytes": field_bytes})
+
+    async def update(self, session_id: str, fields: Dict, unset: Iterable[str] = ()) -> None:
+        """Set fields on a session and remove ``unset``; dotted paths are stored as given, uncompressed"""
+        unset = list(unset)
+        stored_bytes = None
+        if COMPRESSED_FIELDS.intersection(fields) or COMPRESSED_FIELDS.intersection(unset):
+            # Only writes of large fields can grow the session enough to matter
+            stored = await self.collection.find_one({"id": session_id}, {"_id": 0, "field_bytes": 1})
+            stored_bytes = {
+                key: size for key, size in ((stored or {}).get("field_bytes") or {}).items() if key not in unset
+            }
+        encoded, field_bytes = self._encode(fields, stored_bytes)
+        encoded.update({f"field_bytes.{key}": size for key, size in field_bytes.items()})
+        update = {"$set": encoded}
+        if unset:
+            update["$unset"] = {field: "" for field in unset}
+            update["$unset"].update({
+                f"field_bytes.{field}": "" for field in COMPRESSED_FIELDS.intersection(unset)
+            })
+        await self.collection.update_one({"id": session_id}, update)
+
+    async def find_one(self, query: Dict, projection: Optional[Dict] = None, **kwargs) -> Optional[Dict]:
+        projection = {"_id": 0, **(projection or {})}
+        return decode_session(await self.collection.find_one(query, projection, **kwargs))
+
+    async def get(self, session_id: str, fields: Optional[Iterable[str]] = None) -> Optional[Dict]:
+        projection = {field: 1 for field in fields} if fields else None
+        return await self.find_one({"id": session_id}, projection)
+
+    async def find(self, query: Dict, projection: Dict, sort: List, limit: int) -> List[Dict]:
+        cursor = self.collection.find(query, {"_id": 0, **projection}).sort(sort).limit(limit)
+        return [decode_session(document) for document in await cursor.to_list(limit)]
+
+    async def delete(self, session_id: str) -> Optional[Dict]:
+        """Delete a session and its files, returning the deleted session"""
+        session = await self.find_one({"id": session_id}, {"id": 1, "file_paths": 1, "upload_path": 1})
+        if session is None:
+            return None
+        remove_session_files(session)
+        await self.collection.delete_one({"id": session_id})
+        return session
+
+    async def purge_expired(self, batch_size: int = 500) -> List[str]:
+        """Delete expired sessions with their files; returns the deleted session ids"""
+        now = datetime.utcnow()
+        query = {"$or": [
+            {"expires_at": {"$lte": now}},
+            # Sessions stored before expiry existed
+            {"expires_at": {"$exists": False}, "created_at": {"$lte": now - self.ttl}}
+        ]}
+        purged: List[str] = []
+        while True:
+            expired = await self.collection.find(
+                query, {"_id": 0, "id": 1, "file_paths": 1, "upload_path": 1}
+            ).limit(batch_size).to_list(batch_size)
+            for session in expired:
+                remove_session_files(session)
+            if expired:
+                expired_ids = [session["id"] for session in expired]
+                await self.collection.delete_many({"id": {"$in": expired_ids}})
+                purged.extend(expired_ids)
+            if len(expired) < batch_size:
+                return purged
+
+
+def remove_session_files(session: Dict) -> None:
+    paths = list((session.get("file_paths") or {}).values())
+    if session.get("upload_path"):
+        paths.append(session["upload_path"])
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Failed to delete file {path}: {str(e)}")
+
+
+def remove_orphaned_files(directory: str, max_age_seconds: float) -> int:
+    """Remove files older than any live session, e.g. left behind by TTL-index deletes"""
+    cutoff = time.time() - max_age_seconds
+    removed = 0
+    for path in glob.glob(os.path.join(directory, "*")):
+        try:
+            if os.path.isfile(path) and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        except OSError:
+            continue
+    return removed
@@ -0,0 +1,181 @@
+import json
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+class IncrementalJSONParser:
+    """Parses a JSON object as it streams in, chunk by chunk.
+
+    Every top-level member is emitted as soon as its value is complete, so
+    callers can publish sections of an LLM response before the whole
+    document has arrived. A truncated document can be repaired by cutting
+    back to the last complete value and closing any open containers; the
+    top-level members the repair cut short are listed in ``repaired_sections``.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self._pos = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._in_value = False
+        self._in_scalar = False
+        self._started = False
+        self._finished = False
+        self._member_start: Optional[int] = None
+        self._last_safe: Optional[Tuple[int, Tuple[str, ...]]] = None
+        self.sections: Dict[str, Any] = {}
+        self.repaired_sections: Set[str] = set()
+
+    @property
+    def finished(self) -> bool:
+        return self._finished
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """Consume a chunk and return the top-level members completed by it"""
+        self.buffer += chunk
+        completed: List[Tuple[str, Any]] = []
+        buf = self.buffer
+
+        while self._pos < len(buf) and not self._finished:
+            i = self._pos
+            ch = buf[i]
+            self._pos += 1
+
+            if not self._started:
+                # Skip markdown fences or any chatter before the object
+                if ch == "{":
+                    self._started = True
+                    self._stack.append("{")
+                    self._member_start = i + 1
+                    self._last_safe = (i + 1, tuple(self._stack))
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._in_value or self._stack[-1] == "[":
+                        self._last_safe = (i + 1, tuple(self._stack))
+                continue
+
+            if self._in_scalar and (ch.isspace() or ch in ",}]"):
+                # Numbers and literals are only known to be whole once they end
+                self._in_scalar = False
+                self._last_safe = (i, tuple(self._stack))
+
+            if ch == '"':
+                self._in_string = True
+            elif ch == ":":
+                self._in_value = True
+            elif ch in "{[":
+                self._stack.append(ch)
+                self._in_value = False
+                self._last_safe = (i + 1, tuple(self._stack))
+            elif ch in "}]":
+                if len(self._stack) == 1 and ch == "}":
+                    completed.extend(self._complete_member(i))
+                    self._stack.pop()
+                    self._finished = True
+                    self._last_safe = (i + 1, ())
+                    break
+                if self._stack:
+                    self._stack.pop()
+                self._last_safe = (i + 1, tuple(self._stack))
+            elif ch == ",":
+                self._in_value = False
+                self._last_safe = (i, tuple(self._stack))
+                if len(self._stack) == 1:
+                    completed.extend(self._complete_member(i))
+                    self._member_start = i + 1
+            elif not ch.isspace():
+                self._in_scalar = True
+
+        return completed
+
+    def _complete_member(self, end: int) -> List[Tuple[str, Any]]:
+        if self._member_start is None:
+            return []
+        fragment = self.buffer[self._member_start:end].strip()
+        if not fragment:
+            return []
+        try:
+            member = json.loads("{" + fragment + "}")
+        except json.JSONDecodeError:
+            return []
+        items = list(member.items())
+        self.sections.update(member)
+        return items
+
+    def result(self) -> Optional[Dict]:
+        """Return the parsed document, repairing it if it was truncated"""
+        if self._finished:
+            end = self._last_safe[0] if self._last_safe else len(self.buffer)
+            start = self.buffer.find("{")
+            try:
+                return json.loads(self.buffer[start:end])
+            except json.JSONDecodeError:
+                pass
+        return self.repair()
+
+    def repair(self) -> Optional[Dict]:
+        """Close a truncated document at its last complete value"""
+        if self._last_safe is None:
+            return None
+        cut, stack = self._last_safe
+        start = self.buffer.find("{")
+        # Safe points sit after an opener, a closer or a complete value in
+        # value position, so everything up to the cut is a sequence of whole values
+        text = self.buffer[start:cut].rstrip()
+        text += "".join(_CLOSERS[opener] for opener in reversed(stack))
+        try:
+            repaired = json.loads(text)
+        except json.JSONDecodeError:
+            return self.sections or None
+        if not isinstance(repaired, dict):
+            return None
+        _prune_open_containers(repaired, len(stack))
+        self.repaired_sections = set(repaired) - set(self.sections)
+        return repaired
+
+
+def _prune_open_containers(document: Dict, depth: int) -> None:
+    """Drop containers the repair closed while still empty, innermost first
+
+    Open containers are always the last value of their parent, so an entry
+    cut right after its opener would otherwise render as an empty record.
+    """
+    path = [document]
+    for _ in range(depth - 1):
+        parent = path[-1]
+        if not parent:
+            break
+        child = parent[-1] if isinstance(parent, list) else parent[next(reversed(parent))]
+        if not isinstance(child, (dict, list)):
+            break
+        path.append(child)
+    for parent, child in reversed(list(zip(path, path[1:]))):
+        if child:
+            return
+        if isinstance(parent, list):
+            parent.pop()
+        else:
+            parent.pop(next(reversed(parent)))
+
+
+def parse_json_response(text: str) -> Optional[Dict]:
+    """Parse an LLM JSON response, tolerating fences and truncation"""
+    try:
+        parsed = json.loads(text)
+        if isinstance(parsed, dict):
+            return parsed
+    except json.JSONDecodeError:
+        pass
+    parser = IncrementalJSONParser()
+    parser.feed(text)
+    return parser.result()
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from "react";
+import React, { useState, useEffect, useRef } from "react";
 import { useNavigate } from "react-router-dom";
 import { Button } from "./ui/button";
 import { Card, CardContent, CardHeader, CardTitle } from "./ui/card";
@@ -45,6 +45,12 @@ const ResumeOptimizer = () => {
     jobDescription: ""
   });
   
+  // Idempotency key for the current form contents, so retries reuse the same session
+  const submissionKey = useRef(null);
+  useEffect(() => {
+    submissionKey.current = null;
+  }, [formData]);
+
   // Results data
   const [results, setResults] = useState({
     analysis: null,
@@ -119,9 +125,14 @@ const ResumeOptimizer = () => {
       uploadFormData.append('file', formData.file);
       uploadFormData.append('job_description', formData.jobDescription);
 
+      if (!submissionKey.current) {
+        submissionKey.current = `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+      }
+
       const response = await axios.post(`${API}/upload`, uploadFormData, {
         headers: {
-          'Content-Type': 'multipart/form-data'
+          'Content-Type': 'multipart/form-data',
+          'Idempotency-Key': submissionKey.current
         }
       });
 
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Backend modules are imported by their top-level names, as the server does
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
@@ -0,0 +1,157 @@
+import asyncio
+
+import pytest
+from starlette.requests import Request
+
+from admission import AdmissionController, AdmissionRejected, client_identity
+
+
+def request(headers=None, peer="10.0.0.1"):
+    return Request({
+        "type": "http",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()],
+        "client": (peer, 12345),
+    })
+
+
+def test_unauthenticated_client_id_is_ignored():
+    assert client_identity(request({"X-Client-Id": "anything"}), client_keys={}) == "ip:10.0.0.1"
+    assert client_identity(
+        request({"X-Client-Id": "partner", "X-Client-Key": "wrong"}), client_keys={"partner": "secret"}
+    ) == "ip:10.0.0.1"
+
+
+def test_authenticated_client_id_is_used():
+    assert client_identity(
+        request({"X-Client-Id": "partner", "X-Client-Key": "secret"}), client_keys={"partner": "secret"}
+    ) == "id:partner"
+
+
+def test_forwarded_for_is_ignored_without_trusted_proxies():
+    assert client_identity(request({"X-Forwarded-For": "1.2.3.4"}), trusted_proxy_hops=0, client_keys={}) == "ip:10.0.0.1"
+
+
+def test_forwarded_for_uses_entry_appended_by_trusted_proxy():
+    headers = {"X-Forwarded-For": "6.6.6.6, 203.0.113.7"}
+
+    assert client_identity(request(headers), trusted_proxy_hops=1, client_keys={}) == "ip:203.0.113.7"
+    assert client_identity(request(headers), trusted_proxy_hops=2, client_keys={}) == "ip:6.6.6.6"
+
+
+def controller(**kwargs):
+    options = dict(global_concurrency=1, global_rate_per_minute=6000, client_concurrency=10,
+                   client_rate_per_minute=6000, client_burst=100)
+    options.update(kwargs)
+    return AdmissionController(**options)
+
+
+def test_interactive_waiter_starts_before_bulk():
+    admission = controller()
+    started = []
+
+    async def scenario():
+        running = admission.admit("a")
+        await admission.acquire_slot(running)
+        bulk = admission.admit("b", "bulk")
+        interactive = admission.admit("c")
+
+        async def wait(ticket, name):
+            await admission.acquire_slot(ticket)
+            started.append(name)
+            ticket.release()
+
+        # The bulk request queued first, but interactive work is served ahead of it
+        waiters = [asyncio.ensure_future(wait(bulk, "bulk"))]
+        await asyncio.sleep(0)
+        waiters.append(asyncio.ensure_future(wait(interactive, "interactive")))
+        await asyncio.sleep(0)
+        running.release()
+        await asyncio.gather(*waiters)
+
+    asyncio.run(scenario())
+
+    assert started == ["interactive", "bulk"]
+    assert admission.snapshot()["running"] == 0
+
+
+def test_waiter_cancelled_after_handover_passes_the_slot_on():
+    admission = controller()
+
+    async def scenario():
+        running = admission.admit("a")
+        await admission.acquire_slot(running)
+        cancelled = admission.admit("b")
+        waiting = asyncio.ensure_future(admission.acquire_slot(cancelled))
+        await asyncio.sleep(0)
+        later = admission.admit("c")
+        later_waiting = asyncio.ensure_future(admission.acquire_slot(later))
+        await asyncio.sleep(0)
+
+        # The slot is handed to the first waiter, which is cancelled before it resumes
+        running.release()
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        cancelled.release()
+
+        await asyncio.wait_for(later_waiting, timeout=1)
+        assert admission.snapshot()["running"] == 1
+        later.release()
+
+    asyncio.run(scenario())
+
+    snapshot = admission.snapshot()
+    assert snapshot["running"] == 0
+    assert snapshot["queued"] == {"interactive": 0, "bulk": 0}
+    assert snapshot["clients_in_flight"] == 0
+
+
+def test_queue_full_is_rejected_with_retry_after():
+    admission = controller(max_queued={"interactive": 1, "bulk": 1})
+    admission.admit("a")
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        admission.admit("b")
+
+    assert rejected.value.status_code == 429
+    assert "queue is full" in rejected.value.detail
+    assert int(rejected.value.headers["Retry-After"]) >= 1
+
+
+def test_client_concurrency_is_rejected_with_retry_after():
+    admission = controller(client_concurrency=1)
+    ticket = admission.admit("a")
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        admission.admit("a")
+    assert rejected.value.status_code == 429
+    assert int(rejected.value.headers["Retry-After"]) >= 1
+
+    # Other clients and the same client after release are admitted
+    admission.admit("b")
+    ticket.release()
+    admission.admit("a")
+
+
+def test_client_rate_limit_is_rejected_with_retry_after():
+    admission = controller(client_rate_per_minute=6, client_burst=2)
+    for _ in range(2):
+        admission.admit("a").release()
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        admission.admit("a")
+
+    assert rejected.value.status_code == 429
+    assert "rate limit" in rejected.value.detail
+    # One token per 10 seconds
+    assert 1 <= int(rejected.value.headers["Retry-After"]) <= 10
+
+
+def test_released_ticket_is_only_counted_once():
+    admission = controller()
+    ticket = admission.admit("a")
+    ticket.release()
+    ticket.release()
+
+    assert admission.snapshot()["queued"]["interactive"] == 0
+    assert admission.snapshot()["clients_in_flight"] == 0
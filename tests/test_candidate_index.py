@@ -0,0 +1,117 @@
+import asyncio
+import math
+
+import pytest
+
+from candidate_index import CandidateIndex, resume_terms
+
+RESUMES = {
+    "go": ("Backend engineer writing Go services and gRPC APIs", ["Go", "Kubernetes"]),
+    "python": ("Python developer building Django and FastAPI services with PostgreSQL", ["Python", "Django"]),
+    "data": ("Data engineer using Python, Spark and Airflow pipelines", ["Python", "Spark"]),
+    "design": ("Product designer creating Figma prototypes", ["Figma"]),
+}
+
+
+def build(directory=None, **kwargs):
+    index = CandidateIndex(directory, **kwargs)
+    for session_id, (text, skills) in RESUMES.items():
+        index.add(session_id, text, skills)
+    return index
+
+
+def bm25(index, query, session_id):
+    """Reference BM25 score computed directly from the term counts"""
+    documents = {sid: resume_terms(text, skills) for sid, (text, skills) in RESUMES.items()}
+    average_length = sum(sum(counts.values()) for counts in documents.values()) / len(documents)
+    counts = documents[session_id]
+    length = sum(counts.values())
+    score = 0.0
+    for term, weight in query.items():
+        frequency = sum(1 for other in documents.values() if term in other)
+        tf = counts.get(term, 0)
+        if not frequency or not tf:
+            continue
+        idf = math.log(1 + (len(documents) - frequency + 0.5) / (frequency + 0.5))
+        norm = index.k1 * (1 - index.b + index.b * length / average_length)
+        score += weight * idf * tf * (index.k1 + 1) / (tf + norm)
+    return score
+
+
+def test_search_ranks_by_bm25():
+    index = build()
+    query = {"python": 1.0, "spark": 2.0}
+
+    results = index.search(query, k=10)
+
+    assert [session_id for session_id, _ in results] == ["data", "python"]
+    for session_id, score in results:
+        assert score == pytest.approx(bm25(index, query, session_id), rel=1e-5)
+
+
+def test_search_without_matches_or_documents():
+    assert build().search({"cobol": 1.0}) == []
+    assert CandidateIndex(None).search({"python": 1.0}) == []
+
+
+def test_removed_and_replaced_resumes():
+    index = build()
+    index.remove("data")
+    index.add("python", "Rust systems programmer", ["Rust"])
+
+    assert index.search({"python": 1.0}) == []
+    assert [session_id for session_id, _ in index.search({"rust": 1.0})] == ["python"]
+
+
+def test_merge_persists_and_reload_matches(tmp_path):
+    index = build(str(tmp_path))
+    query = {"python": 1.0, "go": 1.0}
+    before = index.search(query)
+
+    index.merge_now()
+    assert index.pending == 0
+    reloaded = CandidateIndex(str(tmp_path))
+    reloaded.load()
+
+    assert len(reloaded) == len(RESUMES)
+    assert reloaded.search(query) == pytest.approx(before)
+    assert [session_id for session_id, _ in reloaded.search(query)] == [session_id for session_id, _ in before]
+
+
+def test_resumes_added_during_merge_stay_pending(tmp_path):
+    index = build(str(tmp_path))
+
+    async def merge_while_adding():
+        merge = asyncio.ensure_future(index.merge())
+        # Let the merge snapshot its pending resumes and hand off to the executor
+        await asyncio.sleep(0)
+        index.add("late", "Late Python hire", ["Python"])
+        await merge
+
+    asyncio.run(merge_while_adding())
+
+    assert index.pending == 1
+    assert "late" in [session_id for session_id, _ in index.search({"python": 1.0})]
+
+
+def test_removal_survives_merge_and_reload(tmp_path):
+    index = build(str(tmp_path))
+    index.merge_now()
+    index.remove("data")
+    index.merge_now()
+
+    reloaded = CandidateIndex(str(tmp_path))
+    reloaded.load()
+
+    assert "data" not in reloaded
+    assert [session_id for session_id, _ in reloaded.search({"python": 1.0})] == ["python"]
+
+
+def test_unreadable_index_starts_empty(tmp_path):
+    build(str(tmp_path)).merge_now()
+    (tmp_path / "postings_docs.npy").write_bytes(b"not an array")
+
+    index = CandidateIndex(str(tmp_path))
+    index.load()
+
+    assert len(index) == 0
@@ -0,0 +1,37 @@
+from typing import List, Sequence
+
+import pytest
+
+from pdf_backends import BACKENDS, PdfBackend
+
+
+def test_incomplete_backend_cannot_be_built():
+    class PageCountOnly(PdfBackend):
+        name = "incomplete"
+
+        def page_count(self, file_path: str) -> int:
+            return 1
+
+    with pytest.raises(TypeError):
+        PageCountOnly()
+
+
+def test_default_line_extraction_uses_extract_pages():
+    class FixedText(PdfBackend):
+        name = "fixed"
+
+        def page_count(self, file_path: str) -> int:
+            return 2
+
+        def extract_pages(self, file_path: str, page_numbers: Sequence[int]) -> List[str]:
+            return ["EXPERIENCE\n• Shipped things", ""][:len(page_numbers)]
+
+    lines = FixedText().extract_lines("unused.pdf", [0, 1])
+
+    assert [line.text for line in lines] == ["EXPERIENCE", "• Shipped things"]
+    assert [line.bullet_hint for line in lines] == [False, True]
+
+
+def test_builtin_backends_are_registered_by_name():
+    assert {"pdfplumber", "pypdf"} <= set(BACKENDS)
+    assert all(backend.name == name for name, backend in BACKENDS.items())
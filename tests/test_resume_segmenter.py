@@ -0,0 +1,69 @@
+import json
+
+from resume_segmenter import ResumeLine, ResumeSegmenter
+
+
+def lines(text, headings=()):
+    return [ResumeLine(text=line, heading_hint=line in headings) for line in text.strip().splitlines()]
+
+
+RESUME = """
+Jane Q Smith
+jane@example.com | (555) 123-4567 | Austin, TX
+SUMMARY
+Backend engineer with eight years of experience building distributed systems at scale.
+EXPERIENCE
+Senior Engineer | Acme Corp | Jan 2020 - Present
+• Built a Kubernetes-based deployment pipeline
+EDUCATION
+B.S. Computer Science, University of Texas
+SKILLS
+Python, Go, Kubernetes
+PROJECTS
+• Kubernetes operator for Postgres failover
+AWARDS
+Engineering Excellence Award 2022
+"""
+
+
+def test_segment_extracts_known_sections():
+    structured = ResumeSegmenter().segment(lines(RESUME))
+
+    assert structured["personal_info"]["name"] == "Jane Q Smith"
+    assert structured["personal_info"]["email"] == "jane@example.com"
+    assert structured["summary"].startswith("Backend engineer")
+    assert structured["experience"][0]["company"] == "Acme Corp"
+    assert structured["experience"][0]["achievements"] == ["• Built a Kubernetes-based deployment pipeline"]
+    assert "Python" in structured["skills"]["technical"]
+
+
+def test_unclassified_sections_are_kept():
+    structured = ResumeSegmenter().segment(lines(RESUME))
+
+    assert structured["additional_sections"] == [
+        {"heading": "PROJECTS", "items": ["Kubernetes operator for Postgres failover"]},
+        {"heading": "AWARDS", "items": ["Engineering Excellence Award 2022"]},
+    ]
+
+
+def test_layout_heading_hint_starts_additional_section():
+    text = RESUME + "\nOPEN SOURCE\nMaintainer of a popular CLI tool\n"
+    structured = ResumeSegmenter().segment(lines(text, headings={"OPEN SOURCE"}))
+
+    assert {"heading": "OPEN SOURCE", "items": ["Maintainer of a popular CLI tool"]} in structured["additional_sections"]
+
+
+def test_compact_payload_includes_additional_sections():
+    segmenter = ResumeSegmenter()
+    structured = segmenter.segment(lines(RESUME))
+
+    assert segmenter.has_content(structured)
+    payload = json.loads(segmenter.compact(structured))
+    assert payload["additional_sections"][0]["items"] == ["Kubernetes operator for Postgres failover"]
+    assert "Engineering Excellence Award 2022" in segmenter.compact(structured)
+
+
+def test_compact_drops_empty_fields():
+    payload = json.loads(ResumeSegmenter.compact({"summary": "", "experience": [], "personal_info": {"name": "A B", "email": ""}}))
+
+    assert payload == {"personal_info": {"name": "A B"}}
@@ -0,0 +1,153 @@
+import asyncio
+import json
+import os
+import zlib
+from datetime import datetime, timedelta
+
+import pytest
+
+from session_store import SessionStore, SessionTooLarge, decode_field, encode_field
+
+
+def _matches(document, query):
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(_matches(document, clause) for clause in condition):
+                return False
+            continue
+        value = document.get(key)
+        if not isinstance(condition, dict):
+            if value != condition:
+                return False
+            continue
+        for operator, operand in condition.items():
+            if operator == "$lte" and not (value is not None and value <= operand):
+                return False
+            if operator == "$exists" and (key in document) != operand:
+                return False
+            if operator == "$in" and value not in operand:
+                return False
+    return True
+
+
+class _Cursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def limit(self, count):
+        return _Cursor(self.documents[:count])
+
+    async def to_list(self, length):
+        return self.documents[:length]
+
+
+class FakeCollection:
+    """Just enough of a Motor collection for SessionStore"""
+
+    def __init__(self):
+        self.documents = []
+
+    async def insert_one(self, document):
+        self.documents.append(dict(document))
+
+    async def find_one(self, query, projection=None):
+        for document in self.documents:
+            if _matches(document, query):
+                return dict(document)
+        return None
+
+    async def update_one(self, query, update):
+        for document in self.documents:
+            if _matches(document, query):
+                for path, value in update.get("$set", {}).items():
+                    target, _, key = path.rpartition(".")
+                    (document.setdefault(target, {}) if target else document)[key] = value
+                for path in update.get("$unset", {}):
+                    target, _, key = path.rpartition(".")
+                    (document.get(target, {}) if target else document).pop(key, None)
+                return
+
+    def find(self, query, projection=None):
+        return _Cursor([dict(document) for document in self.documents if _matches(document, query)])
+
+    async def delete_many(self, query):
+        self.documents = [document for document in self.documents if not _matches(document, query)]
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def incompressible_text(size):
+    return os.urandom(size // 2).hex()
+
+
+def test_small_values_are_stored_as_is():
+    assert encode_field("short") == "short"
+    assert encode_field({"a": 1}) == {"a": 1}
+    assert encode_field(None) is None
+
+
+def test_large_values_round_trip_compressed():
+    text = "Python engineer. " * 100
+    content = {"summary": text, "skills": {"technical": ["Go"] * 100}}
+
+    assert isinstance(encode_field(text), bytes)
+    assert decode_field(bytes(encode_field(text))) == text
+    assert decode_field(bytes(encode_field(content))) == content
+
+
+def test_legacy_plain_values_are_read_unchanged():
+    legacy = {"summary": "stored before compression"}
+
+    assert decode_field(legacy) == legacy
+    assert decode_field("plain text") == "plain text"
+
+
+def test_store_reads_back_plain_values():
+    store = SessionStore(FakeCollection())
+    content = {"summary": "Python engineer. " * 100}
+    run(store.insert({"id": "s1", "status": "uploaded", "optimized_content": content}))
+
+    stored = store.collection.documents[0]
+    assert isinstance(stored["optimized_content"], bytes)
+    assert json.loads(zlib.decompress(stored["optimized_content"][1:])) == content
+    assert run(store.get("s1", ["optimized_content"]))["optimized_content"] == content
+
+
+def test_size_cap_covers_all_writes_to_a_session():
+    store = SessionStore(FakeCollection(), max_bytes=12000)
+    run(store.insert({"id": "s1", "extracted_text": incompressible_text(8000)}))
+    run(store.update("s1", {"analysis": {"notes": incompressible_text(8000)}}))
+
+    # Each write is under the cap on its own, but the session would exceed it
+    with pytest.raises(SessionTooLarge):
+        run(store.update("s1", {"optimized_content": {"summary": incompressible_text(8000)}}))
+
+    # Replacing a field counts its new size instead of adding to the old one
+    run(store.update("s1", {"analysis": {"notes": incompressible_text(8000)}}))
+
+
+def test_single_write_over_the_cap_is_rejected():
+    store = SessionStore(FakeCollection(), max_bytes=10000)
+
+    with pytest.raises(SessionTooLarge):
+        run(store.insert({"id": "s1", "extracted_text": incompressible_text(20000)}))
+    assert store.collection.documents == []
+
+
+def test_purge_expired_deletes_expired_sessions_and_files(tmp_path):
+    store = SessionStore(FakeCollection(), ttl_seconds=3600)
+    upload = tmp_path / "upload.pdf"
+    upload.write_bytes(b"%PDF")
+    now = datetime.utcnow()
+    store.collection.documents = [
+        {"id": "expired", "expires_at": now - timedelta(seconds=1), "upload_path": str(upload)},
+        {"id": "live", "expires_at": now + timedelta(hours=1)},
+        {"id": "legacy-old", "created_at": now - timedelta(hours=2)},
+        {"id": "legacy-new", "created_at": now},
+    ]
+
+    assert sorted(run(store.purge_expired(batch_size=1))) == ["expired", "legacy-old"]
+    assert [document["id"] for document in store.collection.documents] == ["live", "legacy-new"]
+    assert not upload.exists()
@@ -0,0 +1,53 @@
+from streaming_json import IncrementalJSONParser, parse_json_response
+
+
+def repair(text):
+    parser = IncrementalJSONParser()
+    parser.feed(text)
+    return parser.result(), parser.repaired_sections
+
+
+def test_members_are_emitted_as_they_complete():
+    parser = IncrementalJSONParser()
+
+    assert parser.feed('{"summary": "Strong engineer", "ski') == [("summary", "Strong engineer")]
+    assert parser.feed('lls": {"technical": ["Go"]}}') == [("skills", {"technical": ["Go"]})]
+    assert parser.finished
+    assert parser.result() == {"summary": "Strong engineer", "skills": {"technical": ["Go"]}}
+    assert parser.repaired_sections == set()
+
+
+def test_fenced_response_is_parsed():
+    assert parse_json_response('```json\n{"a": [], "b": {}}\n```') == {"a": [], "b": {}}
+
+
+def test_trailing_string_value_is_kept():
+    assert repair('{"summary": "Strong engineer"') == ({"summary": "Strong engineer"}, {"summary"})
+
+
+def test_nested_trailing_value_is_kept():
+    assert repair('{"a": {"b": "x"') == ({"a": {"b": "x"}}, {"a"})
+
+
+def test_unfinished_string_is_dropped():
+    assert repair('{"a": "b", "summary": "Strong eng') == ({"a": "b"}, set())
+
+
+def test_scalar_is_kept_only_once_terminated():
+    assert repair('{"x": [1, 2') == ({"x": [1]}, {"x"})
+    assert repair('{"x": [1, 2 ') == ({"x": [1, 2]}, {"x"})
+
+
+def test_entry_cut_after_opener_is_pruned():
+    result, repaired = repair('{"experience": [{"company": "Acme"}, {"comp')
+
+    assert result == {"experience": [{"company": "Acme"}]}
+    assert repaired == {"experience"}
+
+
+def test_section_cut_while_empty_is_pruned():
+    assert repair('{"summary": "x", "experience": [{') == ({"summary": "x"}, set())
+
+
+def test_complete_empty_containers_are_kept():
+    assert repair('{"skills": {"soft": []}, "experience": [') == ({"skills": {"soft": []}}, set())